@@ -1,8 +1,55 @@
 from __future__ import annotations
 
-from typing import Optional, Any
+import copy
+import math
+import operator
+import re
+from typing import Optional, Any, Callable
 from SimpleJavaParser.SimpleJavaParser import ASTNode
 
+__all__ = ["AstOptimizer"]
+
+# обработчик правил для узла определённого типа
+_Handler = Callable[["AstOptimizer", ASTNode], ASTNode]
+
+
+# Десятичный литерал с необязательными суффиксами l/f/d: группа 1 - целое
+# в том виде, как его принимает int(s, 0) (без ведущих нулей, кроме нулей),
+# группа 2 - то, что понимает float (дробные, с экспонентой, 007).
+# Прочие формы (0x.., подчёркивания, ...) разбираются общим путём.
+_NUMBER_RE = re.compile(
+    r"([+-]?(?:0+|[1-9][0-9]*))[lLfFdD]*"
+    r"|([+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)[lLfFdD]*"
+)
+
+# виды бинарных операций: определяют допустимые типы операндов при свёртке
+_KIND_ARITH = 0   # только числа
+_KIND_ADD = 1     # числа или конкатенация двух строк
+_KIND_CMP = 2     # сравнения, любые сравнимые значения
+_KIND_BOOL = 3    # логические, только boolean
+_KIND_BITS = 4    # побитовые, только целые
+
+
+def _wrap_int(value: int, width: int) -> int:
+    """Значение как знаковое целое Java разрядности width (32 - int, 64 - long)."""
+    value &= (1 << width) - 1
+    return value - (1 << width) if value >> (width - 1) else value
+
+
+# Сдвиги Java: расстояние берётся по модулю разрядности левого операнда,
+# результат укладывается в ту же разрядность
+def _java_lshift(l_val: int, r_val: int, width: int) -> int:
+    return _wrap_int(l_val << (r_val & (width - 1)), width)
+
+
+def _java_rshift(l_val: int, r_val: int, width: int) -> int:
+    return _wrap_int(l_val, width) >> (r_val & (width - 1))
+
+
+def _java_urshift(l_val: int, r_val: int, width: int) -> int:
+    """>>>: левый операнд сдвигается как беззнаковое число своей разрядности."""
+    return _wrap_int((l_val & ((1 << width) - 1)) >> (r_val & (width - 1)), width)
+
 
 class AstOptimizer:
     """
@@ -14,6 +61,39 @@ class AstOptimizer:
     - не меняет порядок операторов.
     """
 
+    # op -> (функция, вид операции)
+    _BIN_OPS: dict[str, tuple[Callable[[Any, Any], Any], int]] = {
+        "ADD": (operator.add, _KIND_ADD),
+        "SUB": (operator.sub, _KIND_ARITH),
+        "MUL": (operator.mul, _KIND_ARITH),
+        "DIV": (operator.truediv, _KIND_ARITH),
+        "MOD": (operator.mod, _KIND_ARITH),
+        "GT": (operator.gt, _KIND_CMP),
+        "LT": (operator.lt, _KIND_CMP),
+        "GE": (operator.ge, _KIND_CMP),
+        "LE": (operator.le, _KIND_CMP),
+        "EQUAL": (operator.eq, _KIND_CMP),
+        "NOTEQUAL": (operator.ne, _KIND_CMP),
+        "AND": (operator.and_, _KIND_BOOL),
+        "OR": (operator.or_, _KIND_BOOL),
+        "BITAND": (operator.and_, _KIND_BITS),
+        "BITOR": (operator.or_, _KIND_BITS),
+        "CARET": (operator.xor, _KIND_BITS),
+    }
+
+    # сдвиги сворачиваются только при известной разрядности (int/long) левого операнда
+    _SHIFT_OPS: dict[str, Callable[[int, int, int], int]] = {
+        "LSHIFT": _java_lshift,
+        "RSHIFT": _java_rshift,
+        "URSHIFT": _java_urshift,
+    }
+
+    # Тексты литералов, которые _literal_to_value заведомо разбирает в целые 0 и 1
+    _INT_LITERAL_TEXTS: dict[int, frozenset[str]] = {
+        0: frozenset(("0", "00", "0L", "0l", "0x0", "0X0", "0d", "0D", "0f", "0F")),
+        1: frozenset(("1", "1L", "1l", "0x1", "0X1", "1d", "1D", "1f", "1F")),
+    }
+
     def __init__(
         self,
         enable_constant_folding: bool = True,
@@ -21,54 +101,88 @@ class AstOptimizer:
     ) -> None:
         self.enable_constant_folding = enable_constant_folding
         self.enable_simplify = enable_simplify
+        # Состояние одного прогона; optimize() работает на копии оптимизатора
+        # со своими таблицами, поэтому общий экземпляр можно вызывать из разных потоков.
+        # Literal, полученный свёрткой -> его значение (текст такого узла не разбирается заново)
+        self._folded_values: dict[ASTNode, Any] = {}
+        # целый Literal, полученный свёрткой -> разрядность (32/64) или None, если неизвестна
+        self._int_widths: dict[ASTNode, Optional[int]] = {}
 
     # ---------------- публичный API ----------------
 
     def optimize(self, root: Optional[ASTNode]) -> Optional[ASTNode]:
         if root is None:
             return None
-        return self._optimize_node(root)
+        run = copy.copy(self)
+        run._folded_values = {}
+        run._int_widths = {}
+        return run._optimize_node(root)
 
     # ---------------- базовый обход ----------------
 
     def _optimize_node(self, node: ASTNode) -> ASTNode:
         """
-        Сначала оптимизируются дочерние узлы, 
-        затем применяются локальные правила к самому узлу.
+        Сначала оптимизируются дочерние узлы,
+        затем к самому узлу применяются локальные правила из _HANDLERS.
+        Список children копируется только при первой реальной замене ребёнка.
         """
-        if isinstance(node.value, ASTNode):
-            node.value = self._optimize_node(node.value)
-
-        new_children = []
-        for ch in node.children or []:
-            if isinstance(ch, ASTNode):
-                new_children.append(self._optimize_node(ch))
-            else:
-                new_children.append(ch)
-        node.children = new_children
+        value = node.value
+        # Literal - лист без правил, в него не спускаемся
+        if isinstance(value, ASTNode) and value.type != "Literal":
+            node.value = self._optimize_node(value)
+
+        children = node.children
+        if children is None:
+            children = node.children = []
+        new_children: Optional[list] = None
+        for i, child in enumerate(children):
+            if isinstance(child, ASTNode) and child.type != "Literal":
+                new_child = self._optimize_node(child)
+                if new_child is not child:
+                    if new_children is None:
+                        new_children = list(children)
+                    new_children[i] = new_child
+        if new_children is not None:
+            node.children = new_children
+
+        handler = self._HANDLERS.get(node.type)
+        if handler is None:
+            return node
+        return handler(self, node)
 
-        t = getattr(node, "type", None)
+    # ---------------- обработчики по типу узла ----------------
 
-        if t == "BinaryOp":
-            if self.enable_constant_folding:
-                folded = self._try_constant_fold_binary(node)
-                if folded is not None:
-                    return folded
-            if self.enable_simplify:
-                return self._simplify_binary(node)
+    def _handle_binary(self, node: ASTNode) -> ASTNode:
+        if self.enable_constant_folding:
+            folded = self._try_constant_fold_binary(node)
+            if folded is not None:
+                return folded
+        if self.enable_simplify:
+            return self._simplify_binary(node)
+        return node
 
-        if t == "PrefixOp" and self.enable_constant_folding:
+    def _handle_prefix(self, node: ASTNode) -> ASTNode:
+        if self.enable_constant_folding:
             folded = self._try_constant_fold_prefix(node)
             if folded is not None:
                 return folded
+        return node
 
-        if t == "Ternary" and self.enable_constant_folding:
+    def _handle_ternary(self, node: ASTNode) -> ASTNode:
+        if self.enable_constant_folding:
             folded = self._try_constant_fold_ternary(node)
             if folded is not None:
                 return folded
-
         return node
 
+    # тип узла -> обработчик (вызывается для узла с уже оптимизированными детьми);
+    # узлы прочих типов не меняются
+    _HANDLERS: dict[str, _Handler] = {
+        "BinaryOp": _handle_binary,
+        "PrefixOp": _handle_prefix,
+        "Ternary": _handle_ternary,
+    }
+
     # ---------------- свёртка констант ----------------
 
     def _try_constant_fold_binary(self, node: ASTNode) -> Optional[ASTNode]:
@@ -78,92 +192,95 @@ class AstOptimizer:
         if len(node.children) != 2:
             return None
         left, right = node.children
-        if not (isinstance(left, ASTNode) and isinstance(right, ASTNode)):
-            return None
-        if left.type != "Literal" or right.type != "Literal":
-            return None
-
-        op = node.value
+        # по инварианту парсера дети - ASTNode; на посторонний объект хватит AttributeError
         try:
-            l_val = self._literal_to_value(left.value)
-            r_val = self._literal_to_value(right.value)
-        except Exception:
+            if left.type != "Literal" or right.type != "Literal":
+                return None
+        except AttributeError:
             return None
 
+        entry = self._BIN_OPS.get(node.value)
+        if entry is None:
+            shift = self._SHIFT_OPS.get(node.value)
+            if shift is None:
+                return None
+            return self._try_constant_fold_shift(node, shift, left, right)
+        func, kind = entry
+
+        l_val = self._literal_node_value(left)
+        r_val = self._literal_node_value(right)
         if l_val is _NoValue or r_val is _NoValue:
             return None
 
-        try:
-            result: Any
-
-            if op in {"ADD", "SUB", "MUL", "DIV", "MOD"}:
-                if op == "ADD" and isinstance(l_val, str) and isinstance(r_val, str):
-                    result = l_val + r_val
-                else:
-                    if not isinstance(l_val, (int, float)) or not isinstance(r_val, (int, float)):
-                        return None
-                    if op == "ADD":
-                        result = l_val + r_val
-                    elif op == "SUB":
-                        result = l_val - r_val
-                    elif op == "MUL":
-                        result = l_val * r_val
-                    elif op == "DIV":
-                        if r_val == 0:
-                            return None
-                        result = l_val / r_val
-                    elif op == "MOD":
-                        if r_val == 0:
-                            return None
-                        result = l_val % r_val
-                    else:
-                        return None
-
-            elif op in {"GT", "LT", "GE", "LE", "EQUAL", "NOTEQUAL"}:
-                if op == "GT":
-                    result = l_val > r_val
-                elif op == "LT":
-                    result = l_val < r_val
-                elif op == "GE":
-                    result = l_val >= r_val
-                elif op == "LE":
-                    result = l_val <= r_val
-                elif op == "EQUAL":
-                    result = l_val == r_val
-                elif op == "NOTEQUAL":
-                    result = l_val != r_val
-                else:
+        if kind == _KIND_ADD:
+            if not (isinstance(l_val, str) and isinstance(r_val, str)):
+                if not isinstance(l_val, (int, float)) or not isinstance(r_val, (int, float)):
                     return None
-
-            elif op in {"AND", "OR"}:
-                if not isinstance(l_val, bool) or not isinstance(r_val, bool):
-                    return None
-                if op == "AND":
-                    result = l_val and r_val
-                else:
-                    result = l_val or r_val
-
-            elif op in {"BITAND", "BITOR", "CARET", "LSHIFT", "RSHIFT", "URSHIFT"}:
-                if not isinstance(l_val, int) or not isinstance(r_val, int):
-                    return None
-                if op == "BITAND":
-                    result = l_val & r_val
-                elif op == "BITOR":
-                    result = l_val | r_val
-                elif op == "CARET":
-                    result = l_val ^ r_val
-                elif op in {"LSHIFT", "RSHIFT", "URSHIFT"}:
-                    result = l_val >> r_val
-                else:
-                    return None
-            else:
+        elif kind == _KIND_ARITH:
+            if not isinstance(l_val, (int, float)) or not isinstance(r_val, (int, float)):
+                return None
+        elif kind == _KIND_BOOL:
+            if not isinstance(l_val, bool) or not isinstance(r_val, bool):
+                return None
+        elif kind == _KIND_BITS:
+            if not isinstance(l_val, int) or not isinstance(r_val, int):
                 return None
 
-            lit_text = self._value_to_literal(result)
-            return ASTNode("Literal", lit_text, token=node.token)
-
+        try:
+            # деление и остаток на ноль, сравнение несравнимых типов -> исключение -> без свёртки
+            result: Any = func(l_val, r_val)
+            lit = self._make_literal(result, node.token)
         except Exception:
             return None
+        if type(result) is int:
+            l_width = self._int_width(left)
+            r_width = self._int_width(right)
+            self._int_widths[lit] = max(l_width, r_width) if l_width and r_width else None
+        return lit
+
+    def _try_constant_fold_shift(
+        self,
+        node: ASTNode,
+        shift: Callable[[int, int, int], int],
+        left: ASTNode,
+        right: ASTNode,
+    ) -> Optional[ASTNode]:
+        """
+        <<, >>, >>> над целыми литералами - по правилам Java для int/long
+        """
+        width = self._int_width(left)
+        if width is None or self._int_width(right) is None:
+            return None
+        l_val = self._literal_node_value(left)
+        r_val = self._literal_node_value(right)
+        if type(l_val) is not int or type(r_val) is not int:
+            return None
+        lit = self._make_literal(shift(l_val, r_val, width), node.token)
+        self._int_widths[lit] = width
+        return lit
+
+    def _int_width(self, node: ASTNode) -> Optional[int]:
+        """
+        Разрядность целого литерала: 64 для суффикса l/L, 32 для прочих целых
+        записей; у результатов свёртки - запомненная. None - тип неизвестен.
+        """
+        width = self._int_widths.get(node, _MISSING)
+        if width is not _MISSING:
+            return width
+        text = node.value
+        if not isinstance(text, str) or not text or not text[0].isdigit():
+            return None
+        s = text.lower().replace("_", "")
+        width = 32
+        if s.endswith("l"):
+            s = s[:-1]
+            width = 64
+        if s.startswith(("0x", "0b")):
+            digits = s[2:]
+            if digits and all(c in "0123456789abcdef" for c in digits):
+                return width
+            return None
+        return width if s.isdigit() else None
 
     def _try_constant_fold_prefix(self, node: ASTNode) -> Optional[ASTNode]:
         """
@@ -172,17 +289,17 @@ class AstOptimizer:
         if not node.children:
             return None
         base = node.children[0]
-        if not isinstance(base, ASTNode) or base.type != "Literal":
-            return None
-
         try:
-            val = self._literal_to_value(base.value)
-        except Exception:
+            if base.type != "Literal":
+                return None
+        except AttributeError:
             return None
+
+        val = self._literal_node_value(base)
         if val is _NoValue:
             return None
 
-        op = node.value
+        op: str = node.value
         try:
             if op == "ADD":
                 result = +val
@@ -198,10 +315,12 @@ class AstOptimizer:
                 result = not val
             else:
                 return None
-            lit_text = self._value_to_literal(result)
-            return ASTNode("Literal", lit_text, token=node.token)
+            lit = self._make_literal(result, node.token)
         except Exception:
             return None
+        if type(result) is int:
+            self._int_widths[lit] = self._int_width(base)
+        return lit
 
     def _try_constant_fold_ternary(self, node: ASTNode) -> Optional[ASTNode]:
         """
@@ -211,12 +330,12 @@ class AstOptimizer:
         if len(node.children) != 3:
             return None
         cond, texpr, fexpr = node.children
-        if not isinstance(cond, ASTNode) or cond.type != "Literal":
-            return None
         try:
-            val = self._literal_to_value(cond.value)
-        except Exception:
+            if cond.type != "Literal":
+                return None
+        except AttributeError:
             return None
+        val = self._literal_node_value(cond)
         if not isinstance(val, bool):
             return None
         return texpr if val else fexpr
@@ -227,7 +346,7 @@ class AstOptimizer:
         if len(node.children) != 2:
             return node
         left, right = node.children
-        op = node.value
+        op: str = node.value
 
         # +0, -0, *1
         # x + 0 -> x
@@ -250,10 +369,7 @@ class AstOptimizer:
                 return left
 
         if op in {"AND", "OR"} and isinstance(left, ASTNode) and left.type == "Literal":
-            try:
-                l_val = self._literal_to_value(left.value)
-            except Exception:
-                l_val = _NoValue
+            l_val = self._literal_node_value(left)
             if isinstance(l_val, bool):
                 if op == "AND":
                     # true && X -> X
@@ -277,11 +393,36 @@ class AstOptimizer:
     def _is_int_literal_with_value(self, node: Any, target: int) -> bool:
         if not isinstance(node, ASTNode) or node.type != "Literal":
             return False
+        texts = self._INT_LITERAL_TEXTS.get(target)
+        if texts is not None and node.value in texts:
+            return True
+        # редкие формы записи - через общий разбор
+        val = self._literal_node_value(node)
+        return isinstance(val, int) and val == target
+
+    def _make_literal(self, value: Any, token: Any) -> ASTNode:
+        """
+        Literal для результата свёртки. Целые, bool и конечные float переживают
+        обратный разбор текста без изменений, поэтому их значение запоминается -
+        внешняя свёртка (1 + 2 + 3) не разбирает текст заново.
+        """
+        lit = ASTNode("Literal", self._value_to_literal(value), token=token)
+        if isinstance(value, int) or (isinstance(value, float) and math.isfinite(value)):
+            self._folded_values[lit] = value
+        return lit
+
+    def _literal_node_value(self, node: ASTNode) -> Any:
+        """
+        Значение Literal-узла. Исходные литералы читаются один-два раза,
+        поэтому их текст разбирается на месте; значения свёрнутых известны заранее.
+        """
+        val = self._folded_values.get(node, _MISSING)
+        if val is not _MISSING:
+            return val
         try:
-            val = self._literal_to_value(node.value)
+            return self._literal_to_value(node.value)
         except Exception:
-            return False
-        return isinstance(val, int) and val == target
+            return _NoValue
 
     def _literal_to_value(self, text: Any) -> Any:
         if text is None:
@@ -290,6 +431,14 @@ class AstOptimizer:
         if not s:
             return _NoValue
 
+        # обычные десятичные числа - одним fullmatch, без снятия суффиксов вручную
+        m = _NUMBER_RE.fullmatch(s)
+        if m is not None:
+            int_text = m.group(1)
+            if int_text is not None:
+                return int(int_text)
+            return float(m.group(2))
+
         ls = s.lower()
         if ls == "null":
             return None
@@ -346,3 +495,7 @@ class _NoValueType:
 
 
 _NoValue = _NoValueType()
+
+
+# маркер отсутствия записи в таблицах одного прогона
+_MISSING = object()
@@ -1,7 +1,23 @@
 import re
+import sys
 from JavaGrammarLexer.Lexer import Lexer
 from Token import Token
 
+
+_DEFAULT_CHANNEL = Token.DEFAULT_CHANNEL
+
+# Типы токенов, которые не берутся из KEYWORDS / SYMBOLS_MAP (значения словарей -
+# строковые константы и так интернированы). m.lastgroup возвращает
+# неинтернированную строку, поэтому тип берётся отсюда.
+_T_IDENTIFIER = sys.intern('IDENTIFIER')
+_T_UNKNOWN = sys.intern('UNKNOWN')
+_LITERAL_TYPES = {
+    'STRING': sys.intern('STRING'),
+    'CHAR': sys.intern('CHAR'),
+    'NUMBER': sys.intern('NUMBER'),
+}
+
+
 class JavaGrammarLexer(Lexer):
 
     KEYWORDS = {
@@ -46,16 +62,29 @@ class JavaGrammarLexer(Lexer):
         self._pos = 0
         self._index = 0  # индекс базового Lexer
 
-        self._whitespace_re = re.compile(r'[ \t\r\n]+')
-        self._comment_re = re.compile(r'//[^\n]*|/\*[\s\S]*?\*/')
-        self._string_re = re.compile(r'"(?:\\.|[^"\\])*"')
-        self._char_re = re.compile(r"'(?:\\.|[^'\\])'")
-        self._number_re = re.compile(r'(?:\d+(?:\.\d+)?|\.\d+)(?:[eE][+-]?\d+)?[fFdDlL]?')
-        self._identifier_re = re.compile(r'[A-Za-z_$][A-Za-z0-9_$]*')
-
-        sym_keys = sorted(self.SYMBOLS_MAP.keys(), key=lambda x: -len(x))
-        sym_pattern = '|'.join(re.escape(s) for s in sym_keys)
-        self._symbol_re = re.compile(sym_pattern)
+        # Операторы и разделители: первый символ -> [(текст, тип)], длинные раньше коротких
+        self._sym_by_first = {}
+        for sym, sym_type in self.SYMBOLS_MAP.items():
+            self._sym_by_first.setdefault(sym[0], []).append((sym, sym_type))
+        for bucket in self._sym_by_first.values():
+            bucket.sort(key=lambda item: -len(item[0]))
+
+        # Порядок групп задаёт приоритет распознавания: при совпадении
+        # нескольких альтернатив в одной позиции побеждает первая.
+        # Пробелы и комментарии сюда не входят - их пропускает _skip_ws_and_comments(),
+        # операторы разбираются по _sym_by_first.
+        token_patterns = [
+            ('STRING', r'"(?:\\.|[^"\\])*"'),
+            ('CHAR', r"'(?:\\.|[^'\\])'"),
+            ('NUMBER', r'(?:\d+(?:\.\d+)?|\.\d+)(?:[eE][+-]?\d+)?[fFdDlL]?'),
+            ('IDENTIFIER', r'[A-Za-z_$][A-Za-z0-9_$]*'),
+        ]
+        self._master_re = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_patterns))
+
+        # Связываются один раз, чтобы не искать атрибуты на каждый токен
+        self._source_pair = (self, self._input)
+        self._create_token = self._factory.create
+        self._keyword_get = self.KEYWORDS.get
 
     def _advance_position(self, text_segment: str):
         """Обновляет self._pos, self._index, self._line и self._column по съеденному тексту."""
@@ -63,90 +92,88 @@ class JavaGrammarLexer(Lexer):
         self._pos += length
         self._index += length
 
-        if '\n' in text_segment:
-            parts = text_segment.split('\n')
-            self._line += len(parts) - 1
-            self._column = len(parts[-1])
+        newlines = text_segment.count('\n')
+        if newlines:
+            self._line += newlines
+            self._column = length - text_segment.rfind('\n') - 1
         else:
             self._column += length
 
+    def _advance_to(self, end: int):
+        """Сдвигает позицию до end, считая переводы строк прямо в self._code (без среза)."""
+        code = self._code
+        pos = self._pos
+        newlines = code.count('\n', pos, end)
+        if newlines:
+            self._line += newlines
+            self._column = end - code.rfind('\n', pos, end) - 1
+        else:
+            self._column += end - pos
+        self._index += end - pos
+        self._pos = end
+
+    def _skip_ws_and_comments(self):
+        """Пропускает пробелы и комментарии перед очередной лексемой одним циклом по self._code."""
+        code = self._code
+        length = self._length
+        pos = self._pos
+        while pos < length:
+            c = code[pos]
+            if c in ' \t\r\n':
+                pos += 1
+            elif c == '/' and code.startswith('//', pos):
+                end = code.find('\n', pos + 2)
+                pos = length if end < 0 else end
+            elif c == '/' and code.startswith('/*', pos):
+                end = code.find('*/', pos + 2)
+                if end < 0:
+                    # незакрытый комментарий не пропускаем - он разберётся как '/' и '*'
+                    break
+                pos = end + 2
+            else:
+                break
+        if pos != self._pos:
+            self._advance_to(pos)
+
     def nextToken(self):
-        while True:
-            if self._pos >= self._length:
-                return self.emitEOF()
-
-            text = self._code[self._pos:]
-
-            # 1) Пробелы / переводы строк - пропускаем
-            m = self._whitespace_re.match(text)
-            if m:
-                value = m.group(0)
-                self._advance_position(value)
-                continue
-
-            # 2) Комментарии (однострочные и многострочные) - просто пропускаем
-            m = self._comment_re.match(text)
-            if m:
-                value = m.group(0)
-                self._advance_position(value)
-                continue
-
-            # 3) Строковый литерал
-            m = self._string_re.match(text)
-            if m:
-                value = m.group(0)
-                start = self._index
-                stop = start + len(value) - 1
-                tok = self._factory.create((self, self._input), 'STRING', value, Token.DEFAULT_CHANNEL, start, stop, self._line, self._column)
-                self._advance_position(value)
-                return tok
-
-            # 4) Символьный литерал
-            m = self._char_re.match(text)
-            if m:
-                value = m.group(0)
-                start = self._index
-                stop = start + len(value) - 1
-                tok = self._factory.create((self, self._input), 'CHAR', value, Token.DEFAULT_CHANNEL, start, stop, self._line, self._column)
-                self._advance_position(value)
-                return tok
-
-            # 5) Числа
-            m = self._number_re.match(text)
-            if m:
-                value = m.group(0)
-                start = self._index
-                stop = start + len(value) - 1
-                tok = self._factory.create((self, self._input), 'NUMBER', value, Token.DEFAULT_CHANNEL, start, stop, self._line, self._column)
-                self._advance_position(value)
-                return tok
-
-            # 6) Идентификатор / ключевое слово
-            m = self._identifier_re.match(text)
-            if m:
-                value = m.group(0)
-                start = self._index
-                stop = start + len(value) - 1
-                token_type = self.KEYWORDS.get(value, 'IDENTIFIER')
-                tok = self._factory.create((self, self._input), token_type, value, Token.DEFAULT_CHANNEL, start, stop, self._line, self._column)
-                self._advance_position(value)
-                return tok
-
-            # 7) Операторы / символы (многосимвольные в приоритете)
-            m = self._symbol_re.match(text)
-            if m:
-                value = m.group(0)
-                start = self._index
-                stop = start + len(value) - 1
-                token_type = self.SYMBOLS_MAP.get(value, 'SYMBOL')
-                tok = self._factory.create((self, self._input), token_type, value, Token.DEFAULT_CHANNEL, start, stop, self._line, self._column)
-                self._advance_position(value)
-                return tok
-
-            # 8) Нераспознанный символ - возвращаем как UNKNOWN
-            value = text[0]
-            start = self._index
-            stop = start
-            tok = self._factory.create((self, self._input), 'UNKNOWN', value, Token.DEFAULT_CHANNEL, start, stop, self._line, self._column)
-            self._advance_position(value)
-            return tok
+        self._skip_ws_and_comments()
+
+        pos = self._pos
+        if pos >= self._length:
+            return self.emitEOF()
+
+        code = self._code
+        c = code[pos]
+        bucket = self._sym_by_first.get(c)
+        m = None
+        # оператор определяется по первому символу без регулярки;
+        # '.' ещё может начинать число (.5), поэтому для неё сначала пробуем master
+        if bucket is None or c == '.':
+            # Один проход master-регулярки с позиции pos, без копирования хвоста исходника
+            m = self._master_re.match(code, pos)
+
+        if m is not None:
+            kind = m.lastgroup
+            value = m.group(0)
+            if kind == 'IDENTIFIER':
+                token_type = self._keyword_get(value, _T_IDENTIFIER)
+            else:
+                # STRING / CHAR / NUMBER - имя группы совпадает с типом токена
+                token_type = _LITERAL_TYPES[kind]
+        else:
+            # Нераспознанный символ - возвращаем как UNKNOWN
+            value = c
+            token_type = _T_UNKNOWN
+            if bucket is not None:
+                # многосимвольные операторы в приоритете (корзина отсортирована по длине)
+                for sym, sym_type in bucket:
+                    if code.startswith(sym, pos):
+                        value = sym
+                        token_type = sym_type
+                        break
+
+        start = self._index
+        stop = start + len(value) - 1
+        tok = self._create_token(self._source_pair, token_type, value, _DEFAULT_CHANNEL, start, stop, self._line, self._column)
+        self._advance_position(value)
+        return tok
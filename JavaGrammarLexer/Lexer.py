@@ -32,6 +32,18 @@ class Lexer:
         raise NotImplementedError("Метод nextToken() должен быть переопределён в подклассе")
 
 
+    def __iter__(self):
+        """
+        Токены по одному, включая завершающий EOF.
+        """
+        next_token = self.nextToken
+        while True:
+            token = next_token()
+            yield token
+            if token.type == Token.EOF:
+                return
+
+
     def emit(self, token_type, text, channel=DEFAULT_TOKEN_CHANNEL):
         """
         Создаёт токен и сохраняет его как текущий.
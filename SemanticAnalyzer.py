@@ -1,45 +1,89 @@
+import re
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Tuple
 from SimpleJavaParser.SimpleJavaParser import ASTNode
 
+__all__ = [
+    "TypeInfo", "VarInfo", "MethodInfo", "ClassInfo", "Scope",
+    "SemanticError", "SemanticAnalyzer",
+]
+
 
 
 # ---------------- Вспомогательные структуры ----------------
 
 
-@dataclass
-class TypeInfo:
-    name: str
+_NUMERIC_TYPES = frozenset({"byte", "short", "int", "long", "float", "double", "char"})
+_PRIMITIVE_TYPES = _NUMERIC_TYPES | {"boolean"}
 
-    @property
-    def is_unknown(self) -> bool:
-        return self.name == "Unknown"
+# идентификаторы, которые разбираются особо, а не через Scope.resolve
+_SPECIAL_IDENTIFIERS = frozenset({"this", "super", "System"})
 
-    @property
-    def is_primitive(self) -> bool:
-        return self.name in {"byte", "short", "int", "long", "float", "double", "boolean", "char"}
 
-    @property
-    def is_boolean(self) -> bool:
-        return self.name == "boolean"
+# биты TypeInfo.flags
+_TF_PRIMITIVE = 1
+_TF_STRING = 2
+_TF_UNKNOWN = 4
+_TF_NUMERIC = 8
+_TF_BOOLEAN = 16
+# для примитивов и String совместимость - только совпадение типа
+_TF_EXACT_MATCH = _TF_PRIMITIVE | _TF_STRING
 
-    @property
-    def is_numeric(self) -> bool:
-        return self.name in {"byte", "short", "int", "long", "float", "double", "char"}
 
-    @property
-    def is_string(self) -> bool:
-        return self.name == "String"
+class TypeInfo:
+    """
+    Тип по имени. Встроенные типы (примитивы, String, null, Unknown) интернированы
+    навсегда: TypeInfo.of(name) для них всегда возвращает один и тот же объект.
+    Прочие имена приходят из разбираемых программ и кэшируются ограниченно,
+    поэтому такие типы сравниваются через ==.
+    """
+
+    __slots__ = (
+        "name", "is_unknown", "is_primitive", "is_boolean", "is_numeric",
+        "is_string", "is_array", "is_list", "flags", "_element_type",
+    )
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        # признаки категории вычисляются один раз: экземпляры интернированы
+        self.is_unknown = name == "Unknown"
+        self.is_primitive = name in _PRIMITIVE_TYPES
+        self.is_boolean = name == "boolean"
+        self.is_numeric = name in _NUMERIC_TYPES
+        self.is_string = name == "String"
+        # Тип массива: 'T[]', 'int[]', 'String[][]' и т.п.
+        self.is_array = name.endswith("[]")
+        # Простейшее распознавание List<T>
+        self.is_list = name.startswith("List<") and name.endswith(">")
+        # те же признаки битами - для проверок совместимости одним выражением
+        self.flags = (
+            (_TF_UNKNOWN if self.is_unknown else 0)
+            | (_TF_PRIMITIVE if self.is_primitive else 0)
+            | (_TF_STRING if self.is_string else 0)
+            | (_TF_NUMERIC if self.is_numeric else 0)
+            | (_TF_BOOLEAN if self.is_boolean else 0)
+        )
+        self._element_type: Optional["TypeInfo"] = None
 
-    @property
-    def is_array(self) -> bool:
-        """Тип массива: 'T[]', 'int[]', 'String[][]' и т.п."""
-        return self.name.endswith("[]")
+    @classmethod
+    def of(cls, name: str) -> "TypeInfo":
+        return _intern_type(name)
 
-    @property
-    def is_list(self) -> bool:
-        """Простейшее распознавание List<T>."""
-        return self.name.startswith("List<") and self.name.endswith(">")
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, TypeInfo):
+            return self.name == other.name
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __repr__(self) -> str:
+        return f"TypeInfo(name={self.name!r})"
 
     @property
     def element_type(self) -> "TypeInfo":
@@ -48,27 +92,159 @@ class TypeInfo:
         - 'List<T>' -> 'T';
         - иначе Unknown.
         """
+        if self._element_type is None:
+            self._element_type = self._compute_element_type()
+        return self._element_type
+
+    def _compute_element_type(self) -> "TypeInfo":
         if self.is_array:
             base = self.name
             while base.endswith("[]"):
                 base = base[:-2]
             base = base.strip()
-            return TypeInfo(base) if base else TypeInfo("Unknown")
+            return TypeInfo.of(base) if base else TypeInfo.of("Unknown")
 
         # List<T>
         if self.is_list:
             inner = self.name[len("List<"):-1].strip()
             if not inner:
-                return TypeInfo("Unknown")
-            return TypeInfo(inner)
+                return TypeInfo.of("Unknown")
+            return TypeInfo.of(inner)
 
-        return TypeInfo("Unknown")
+        return TypeInfo.of("Unknown")
 
     def __str__(self) -> str:
         return self.name
 
 
-@dataclass
+# встроенные типы - по одному объекту на процесс, их можно сравнивать через `is`
+_BUILTIN_TYPES: Dict[str, TypeInfo] = {
+    name: TypeInfo(sys.intern(name))
+    for name in ("byte", "short", "int", "long", "float", "double", "boolean", "char",
+                 "void", "String", "null", "Unknown")
+}
+
+
+@lru_cache(maxsize=4096)
+def _user_type(name: str) -> TypeInfo:
+    # имена классов и generic-типов из входных программ: кэш ограничен, чтобы
+    # долгоживущий процесс (main.py) не копил их бесконечно
+    return TypeInfo(name)
+
+
+def _intern_type(name: str) -> TypeInfo:
+    builtin = _BUILTIN_TYPES.get(name)
+    if builtin is not None:
+        return builtin
+    return _user_type(name)
+
+
+@lru_cache(maxsize=4096)
+def _parse_type_str(type_str: str) -> TypeInfo:
+    """Тип по строке из объявления; результат зависит только от строки."""
+    type_str = type_str.strip()
+    if not type_str:
+        return _intern_type("Unknown")
+    return _intern_type(type_str)
+
+_UNKNOWN = TypeInfo.of("Unknown")
+
+
+def _arg_type_compatible(expected: TypeInfo, actual: TypeInfo) -> bool:
+    """Совместимость типа аргумента (или правой части присваивания) с ожидаемым."""
+    flags = expected.flags | actual.flags
+    if flags & _TF_UNKNOWN:
+        return True
+    if flags & _TF_EXACT_MATCH:
+        return expected.name == actual.name
+    return True
+
+
+def _resolve_overload(same_arity: List["MethodInfo"], arg_types: List[TypeInfo]) -> Optional[TypeInfo]:
+    """
+    Тип результата первой перегрузки, принимающей аргументы arg_types,
+    или None, если подходящей нет.
+    """
+    if len(same_arity) == 1:
+        # обычный случай - метод без перегрузок
+        m = same_arity[0]
+        for expected, actual in zip(m.param_types, arg_types):
+            if not _arg_type_compatible(expected, actual):
+                return None
+        return m.return_type
+
+    for m in same_arity:
+        for expected, actual in zip(m.param_types, arg_types):
+            if not _arg_type_compatible(expected, actual):
+                break
+        else:
+            return m.return_type
+    return None
+
+
+_KEYWORD_LITERAL_TYPES = {
+    "true": TypeInfo.of("boolean"),
+    "false": TypeInfo.of("boolean"),
+    "null": TypeInfo.of("null"),
+}
+
+# группа 1 - целое (int), группа 2 - дробное или с экспонентой (double);
+# как и при разборе через int()/float(), допускается один суффикс l/f/d
+_NUMBER_LITERAL_RE = re.compile(
+    r"([0-9]+)[lLfFdD]?"
+    r"|((?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?|[0-9]+[eE][+-]?[0-9]+)[lLfFdD]?"
+)
+
+
+@lru_cache(maxsize=4096)
+def _literal_type(text: str) -> TypeInfo:
+    """Тип литерала по его тексту; набор различных литералов в программе невелик."""
+    keyword_type = _KEYWORD_LITERAL_TYPES.get(text)
+    if keyword_type is not None:
+        return keyword_type
+
+    if not text:
+        return _UNKNOWN
+
+    # строки и символы - по первому и последнему символу, без вызовов методов
+    first = text[0]
+    if first == '"' and text[-1] == '"':
+        return TypeInfo.of("String")
+    if first == "'" and text[-1] == "'" and len(text) >= 3:
+        return TypeInfo.of("char")
+
+    # обычные десятичные числа - одним fullmatch, без исключений
+    m = _NUMBER_LITERAL_RE.fullmatch(text)
+    if m is not None:
+        return TypeInfo.of("int") if m.group(1) is not None else TypeInfo.of("double")
+
+    # редкие формы (подчёркивания, inf, ...) - прежним разбором через int()/float()
+    num = text
+    if num[-1:] in "lLfFdD":
+        num = num[:-1]
+
+    try:
+        int(num)
+        return TypeInfo.of("int")
+    except ValueError:
+        pass
+
+    try:
+        float(num)
+        return TypeInfo.of("double")
+    except ValueError:
+        pass
+
+    return TypeInfo.of("Unknown")
+
+
+@lru_cache(maxsize=256)
+def _modifiers_have_static(modifiers: str) -> bool:
+    """'PUBLIC,STATIC' -> True; различных строк модификаторов в программе немного."""
+    return "STATIC" in modifiers.upper().replace(",", " ").split()
+
+
+@dataclass(slots=True)
 class VarInfo:
     name: str
     type: TypeInfo
@@ -77,16 +253,23 @@ class VarInfo:
     is_param: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class MethodInfo:
     name: str
     return_type: TypeInfo
     param_types: List[TypeInfo] = field(default_factory=list)
     is_static: bool = False
     is_constructor: bool = False
+    # производные от param_types, которые не меняются после регистрации
+    arity: int = field(init=False, repr=False, compare=False)
+    signature: str = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        self.arity = len(self.param_types)
+        self.signature = ", ".join(t.name for t in self.param_types)
 
-@dataclass
+
+@dataclass(slots=True)
 class ClassInfo:
     name: str
     fields: Dict[str, VarInfo] = field(default_factory=dict)
@@ -94,40 +277,87 @@ class ClassInfo:
     super_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Scope:
     parent: Optional["Scope"] = None
     vars: Dict[str, VarInfo] = field(default_factory=dict)
+    # все видимые имена (свои + родительские) для разрешения одним обращением;
+    # копия родительского словаря берётся при создании: родитель не объявляет
+    # новых имён, пока анализируется вложенная область
+    _visible: Dict[str, VarInfo] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._visible = dict(self.parent._visible) if self.parent is not None else {}
+        self._visible.update(self.vars)
 
     def declare(self, var: VarInfo) -> bool:
         if var.name in self.vars:
             return False
         self.vars[var.name] = var
+        self._visible[var.name] = var
         return True
 
     def resolve(self, name: str) -> Optional[VarInfo]:
-        scope: Optional["Scope"] = self
-        while scope is not None:
-            if name in scope.vars:
-                return scope.vars[name]
-            scope = scope.parent
-        return None
+        return self._visible.get(name)
 
 
 class SemanticError(Exception):
-
-    def __init__(self, message: str, node: Optional[ASTNode] = None):
-        super().__init__(message)
-        self.message = message
+    """
+    Ошибка семантического анализа. Если заданы fmt_args, message - шаблон
+    для str.format, и текст собирается только при первом обращении к message,
+    args, str() или repr(). Снаружи ошибка ведёт себя как обычное исключение
+    с одним аргументом: args == (message,), message можно переприсвоить.
+    """
+
+    __slots__ = ("_template", "_fmt_args", "_message", "node", "line", "column")
+
+    def __init__(self, message: str, node: Optional[ASTNode] = None, *fmt_args: object) -> None:
+        # args отдаётся свойством ниже, чтобы не форматировать текст заранее
+        super().__init__()
+        self._template = message
+        self._fmt_args = fmt_args
+        self._message: Optional[str] = None if fmt_args else message
         self.node = node
         # Координаты извлекаем из узла, если они есть
+        self.line: Optional[int]
+        self.column: Optional[int]
         if node is not None:
-            self.line = getattr(node, "line", None)
-            self.column = getattr(node, "column", None)
+            self.line = node.line
+            self.column = node.column
         else:
             self.line = None
             self.column = None
 
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = self._template.format(*self._fmt_args)
+        return self._message
+
+    @message.setter
+    def message(self, value: str) -> None:
+        self._message = value
+
+    @property
+    def args(self) -> tuple:
+        # явно присвоенные args - как у Exception, иначе (message,)
+        return BaseException.args.__get__(self) or (self.message,)
+
+    @args.setter
+    def args(self, value: tuple) -> None:
+        BaseException.args.__set__(self, value)
+
+    def __repr__(self) -> str:
+        args = self.args
+        if len(args) == 1:
+            return f"{type(self).__name__}({args[0]!r})"
+        return f"{type(self).__name__}{args!r}"
+
+    def __reduce__(self):
+        # по умолчанию копия собирается как cls(*args) и потеряла бы узел и аргументы шаблона;
+        # переприсвоенный message переносится состоянием
+        return (type(self), (self._template, self.node) + self._fmt_args, {"_message": self._message})
+
     def __str__(self) -> str:
         if self.line is not None and self.column is not None:
             return f"{self.message} (строка {self.line}, столбец {self.column})"
@@ -137,13 +367,24 @@ class SemanticError(Exception):
 # ---------------- Семантический анализатор ----------------
 
 
+# обработчики узлов для таблиц диспетчеризации анализатора
+_StmtHandler = Callable[[ASTNode, Scope, ClassInfo], None]
+_ExprHandler = Callable[[ASTNode, Scope, ClassInfo], TypeInfo]
+
+
 class SemanticAnalyzer:
 
-    def __init__(self):
+    def __init__(self) -> None:
         self.classes: Dict[str, ClassInfo] = {}
         self.errors: List[SemanticError] = []
 
         self._current_method: Optional[MethodInfo] = None
+        # (класс, имя метода) -> перегрузки с учётом предков; живёт в пределах analyze()
+        self._method_cache: Dict[Tuple[str, str], List[MethodInfo]] = {}
+        # (класс, имя метода, число аргументов) -> перегрузки с такой арностью
+        self._arity_cache: Dict[Tuple[str, str, int], List[MethodInfo]] = {}
+        # узел MethodDecl/ConstructorDecl -> сигнатура, разобранная при регистрации
+        self._method_infos: Dict[ASTNode, MethodInfo] = {}
 
         self.global_var_count: int = 0
         self.global_var_limit: Optional[int] = 128 
@@ -151,14 +392,55 @@ class SemanticAnalyzer:
         self._block_depth: int = 0
         self.block_depth_limit: Optional[int] = None
 
+        # необязательный предел числа ошибок (None - без предела): когда очередная ошибка
+        # в него уже не помещается, анализ выражений прекращается, а последней в errors
+        # идёт ошибка об остановке анализа
+        self.error_limit: Optional[int] = None
+        self._errors_exhausted: bool = False
+
+        # тип узла -> обработчик; узлы прочих типов обходятся по детям
+        self._stmt_dispatch: Dict[str, _StmtHandler] = {
+            "Block": self._analyze_block,
+            "FieldDecl": self._analyze_local_decl,
+            "ExprStmt": self._analyze_expr_stmt,
+            "Assign": self._analyze_assign_stmt,
+            "IfStatement": self._analyze_if_statement,
+            "WhileStatement": self._analyze_while_statement,
+            "DoWhileStatement": self._analyze_do_while_statement,
+            "ForStatement": self._analyze_for_statement,
+            "Return": self._analyze_return,
+            "SwitchStatement": self._analyze_switch_statement,
+            "Break": self._analyze_nested_blocks,
+            "Continue": self._analyze_nested_blocks,
+            "CaseLabel": self._analyze_nested_blocks,
+            "DefaultLabel": self._analyze_nested_blocks,
+            "TryStatement": self._analyze_nested_blocks,
+        }
+        self._expr_dispatch: Dict[str, _ExprHandler] = {
+            "Literal": self._analyze_literal,
+            "Identifier": self._analyze_identifier,
+            "Member": self._analyze_lhs,
+            "ArrayInit": self._analyze_array_init,
+            "BinaryOp": self._analyze_binary_op,
+            "PrefixOp": self._analyze_prefix_op,
+            "PostfixOp": self._analyze_postfix_op,
+            "Ternary": self._analyze_ternary,
+            "Call": self._analyze_call,
+            "Assign": self._analyze_assign_expr,
+        }
+
     # ---------- Публичный API ----------
 
     def analyze(self, ast: ASTNode) -> List[SemanticError]:
         self.classes.clear()
         self.errors.clear()
+        self._method_cache.clear()
+        self._arity_cache.clear()
+        self._method_infos.clear()
         self._current_method = None
         self.global_var_count = 0
         self._block_depth = 0
+        self._errors_exhausted = False
 
         if ast.type != "CompilationUnit":
             raise SemanticError("Ожидался корневой узел CompilationUnit", ast)
@@ -178,67 +460,65 @@ class SemanticAnalyzer:
     # ---------- Регистрация классов/методов/полей ----------
 
     def _register_class(self, node: ASTNode) -> None:
-        class_name = node.value or "Anonymous"
+        # имена классов, методов и полей интернируются: ключи словарей сравниваются по указателю
+        class_name = sys.intern(node.value or "Anonymous")
         if class_name in self.classes:
-            self._error(f"Класс '{class_name}' уже объявлен", node)
+            self._error("Класс '{}' уже объявлен", node, class_name)
             return
 
         ci = ClassInfo(name=class_name)
 
+        # Базовый класс, поля и методы на верхнем уровне тела класса - за один проход.
         for child in node.children:
-            if isinstance(child, ASTNode) and child.type == "Base":
+            if not isinstance(child, ASTNode):
+                continue
+            if child.type == "Base":
                 if child.value:
                     parts = child.value.split()
                     if len(parts) == 2 and parts[0] == "extends":
-                        ci.super_name = parts[1]
+                        ci.super_name = sys.intern(parts[1])
 
-        # Поля и методы на верхнем уровне тела класса.
-        for child in node.children:
-            if not isinstance(child, ASTNode):
-                continue
-            if child.type == "FieldDecl":
+            elif child.type == "FieldDecl":
                 var = self._field_decl_to_varinfo(child, is_field=True)
                 if var is not None:
-                    if var.name in ci.fields:
-                        self._error(f"Поле '{var.name}' уже объявлено в классе '{class_name}'", child)
+                    if ci.fields.setdefault(var.name, var) is not var:
+                        self._error("Поле '{}' уже объявлено в классе '{}'", child, var.name, class_name)
                     else:
-                        ci.fields[var.name] = var
                         # Учитываем глобальные идентификаторы
                         self.global_var_count += 1
                         if self.global_var_limit is not None and self.global_var_count > self.global_var_limit:
                             self._error(
-                                f"Превышено максимальное число глобальных идентификаторов ({self.global_var_limit})",
-                                child,
+                                "Превышено максимальное число глобальных идентификаторов ({})",
+                                child, self.global_var_limit,
                             )
 
             elif child.type == "MethodDecl":
                 mi = self._extract_method_info(child, class_name, is_constructor=False)
                 if mi is not None:
-                    if mi.name in ci.methods:
-                        self._error(f"Метод '{mi.name}' уже объявлен в классе '{class_name}'", child)
-                    else:
-                        ci.methods[mi.name] = [mi]
+                    self._method_infos[child] = mi
+                    overloads = [mi]
+                    if ci.methods.setdefault(mi.name, overloads) is not overloads:
+                        self._error("Метод '{}' уже объявлен в классе '{}'", child, mi.name, class_name)
 
             elif child.type == "ConstructorDecl":
                 mi = self._extract_method_info(child, class_name, is_constructor=True)
                 if mi is not None:
-                    if mi.name in ci.methods:
-                        self._error(f"Метод '{mi.name}' уже объявлен в классе '{class_name}'", child)
-                    else:
-                        ci.methods[mi.name] = [mi]
+                    self._method_infos[child] = mi
+                    overloads = [mi]
+                    if ci.methods.setdefault(mi.name, overloads) is not overloads:
+                        self._error("Метод '{}' уже объявлен в классе '{}'", child, mi.name, class_name)
 
         self.classes[class_name] = ci
 
     def _field_decl_to_varinfo(self, node: ASTNode, is_field: bool) -> Optional[VarInfo]:
         if not isinstance(node.value, str):
             return None
-        parts = node.value.strip().split()
-        if len(parts) < 2:
+        # 'int[] xs' -> ('int[]', 'xs'); тип и имя парсер разделяет одним пробелом
+        type_str, _, name = node.value.strip().rpartition(" ")
+        if not type_str:
             return None
-        type_str = " ".join(parts[:-1])
-        name = parts[-1]
         tinfo = self._parse_type(type_str)
-        return VarInfo(name=name, type=tinfo, is_field=is_field)
+        return VarInfo(name=sys.intern(name), type=tinfo, is_field=is_field)
 
     def _extract_method_info(
         self,
@@ -248,41 +528,41 @@ class SemanticAnalyzer:
     ) -> Optional[MethodInfo]:
         if is_constructor:
             name = class_name
-            return_type = TypeInfo("void")
+            return_type = TypeInfo.of("void")
         else:
             if not isinstance(node.value, str):
                 return None
-            parts = node.value.strip().split()
-            if len(parts) < 2:
+            ret_type_str, _, name = node.value.strip().rpartition(" ")
+            if not ret_type_str:
                 return None
-            ret_type_str = " ".join(parts[:-1])
-            name = parts[-1]
             return_type = self._parse_type(ret_type_str)
 
+        # параметры и модификаторы - за один проход по детям
         param_types: List[TypeInfo] = []
+        is_static = False
         for ch in node.children:
-            if isinstance(ch, ASTNode) and ch.type == "Param" and isinstance(ch.value, str):
-                p_parts = ch.value.strip().split()
-                if len(p_parts) >= 1:
-                    type_str = " ".join(p_parts[:-1]) if len(p_parts) > 1 else p_parts[0]
-                    param_types.append(self._parse_type(type_str))
+            if not isinstance(ch, ASTNode) or not isinstance(ch.value, str):
+                continue
+            if ch.type == "Param":
+                type_str, _, p_name = ch.value.strip().rpartition(" ")
+                if p_name:
+                    param_types.append(self._parse_type(type_str or p_name))
+            elif ch.type == "Modifiers" and not is_static:
+                is_static = _modifiers_have_static(ch.value)
 
         return MethodInfo(
-            name=name,
+            name=sys.intern(name),
             return_type=return_type,
             param_types=param_types,
-            is_static=self._has_static_modifier(node),
+            is_static=is_static,
             is_constructor=is_constructor,
         )
 
     def _has_static_modifier(self, node: ASTNode) -> bool:
         for ch in node.children:
             if isinstance(ch, ASTNode) and ch.type == "Modifiers" and isinstance(ch.value, str):
-                # 'PUBLIC,STATIC' -> ['PUBLIC', 'STATIC']
-                raw = ch.value.replace(",", " ")
-                for m in raw.split():
-                    if m.upper() == "STATIC":
-                        return True
+                if _modifiers_have_static(ch.value):
+                    return True
         return False
 
     # ---------- Анализ внутри классов ----------
@@ -307,41 +587,49 @@ class SemanticAnalyzer:
         method_scope = Scope(parent=class_scope)
 
         is_constructor = node.type == "ConstructorDecl"
-        mi = self._extract_method_info(node, ci.name, is_constructor=is_constructor)
+        if node in self._method_infos:
+            # сигнатура уже разобрана при регистрации класса
+            mi = self._method_infos[node]
+        else:
+            mi = self._extract_method_info(node, ci.name, is_constructor=is_constructor)
 
         is_static = mi.is_static if mi is not None else self._has_static_modifier(node)
 
         if not is_static:
-            this_var = VarInfo(name="this", type=TypeInfo(ci.name), is_param=True)
+            this_var = VarInfo(name="this", type=TypeInfo.of(ci.name), is_param=True)
             method_scope.declare(this_var)
             if ci.super_name:
-                super_var = VarInfo(name="super", type=TypeInfo(ci.super_name), is_param=True)
+                super_var = VarInfo(name="super", type=TypeInfo.of(ci.super_name), is_param=True)
                 method_scope.declare(super_var)
 
+        # один проход: параметры отдельно, тело метода отдельно
+        params: List[ASTNode] = []
+        body: List[ASTNode] = []
         for ch in node.children:
-            if isinstance(ch, ASTNode) and ch.type == "Param" and isinstance(ch.value, str):
-                parts = ch.value.strip().split()
-                if len(parts) < 1:
-                    continue
-                if len(parts) == 1:
-                    p_type = TypeInfo("Unknown")
-                    p_name = parts[0]
-                else:
-                    type_str = " ".join(parts[:-1])
-                    p_name = parts[-1]
-                    p_type = self._parse_type(type_str)
-                var = VarInfo(name=p_name, type=p_type, is_param=True)
-                if not method_scope.declare(var):
-                    self._error(f"Повторное объявление параметра '{p_name}'", ch)
+            if not isinstance(ch, ASTNode):
+                continue
+            if ch.type == "Param":
+                if isinstance(ch.value, str):
+                    params.append(ch)
+            elif ch.type != "Modifiers":
+                body.append(ch)
+
+        for ch in params:
+            type_str, _, p_name = ch.value.strip().rpartition(" ")
+            if not p_name:
+                continue
+            if not type_str:
+                p_type = TypeInfo.of("Unknown")
+            else:
+                p_type = self._parse_type(type_str)
+            var = VarInfo(name=p_name, type=p_type, is_param=True)
+            if not method_scope.declare(var):
+                self._error("Повторное объявление параметра '{}'", ch, p_name)
 
         prev_method = self._current_method
         self._current_method = mi
 
-        for ch in node.children:
-            if not isinstance(ch, ASTNode):
-                continue
-            if ch.type in {"Param", "Modifiers"}:
-                continue
+        for ch in body:
             self._analyze_statement(ch, method_scope, ci)
 
         self._current_method = prev_method
@@ -352,169 +640,178 @@ class SemanticAnalyzer:
         self._block_depth += 1
         if self.block_depth_limit is not None and self._block_depth > self.block_depth_limit:
             self._error(
-                f"Превышена максимальная глубина вложенности блоков: {self._block_depth}",
-                block,
+                "Превышена максимальная глубина вложенности блоков: {}",
+                block, self._block_depth,
             )
 
         try:
             block_scope = Scope(parent=scope)
             for stmt in block.children:
-                if isinstance(stmt, ASTNode):
+                if stmt is not None:
                     self._analyze_statement(stmt, block_scope, ci)
         finally:
             self._block_depth -= 1
 
     def _analyze_statement(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
-        t = node.type
-
-        if t == "Block":
-            self._analyze_block(node, scope, ci)
-
-        elif t == "FieldDecl":
-            var = self._field_decl_to_varinfo(node, is_field=False)
-            if var is None:
-                return
-            if not scope.declare(var):
-                self._error(f"Повторное объявление переменной '{var.name}'", node)
-
-            init_expr = None
-            for ch in node.children:
-                if isinstance(ch, ASTNode) and ch.type == "Init":
-                    if ch.children:
-                        init_expr = ch.children[0]
-                    break
-            if init_expr is not None:
-                rhs_type = self._analyze_expression(init_expr, scope, ci)
-
-                if var.type.is_array and isinstance(init_expr, ASTNode) and init_expr.type == "ArrayInit":
-                    elem_expected = var.type.element_type
-                    for elem in init_expr.children:
-                        if isinstance(elem, ASTNode):
-                            elem_type = self._analyze_expression(elem, scope, ci)
-                            self._check_assignment_compatibility(elem_expected, elem_type, elem)
-                else:
-                    self._check_assignment_compatibility(var.type, rhs_type, init_expr)
-
-        elif t == "ExprStmt":
-            if node.children:
-                self._analyze_expression(node.children[0], scope, ci)
-
-        elif t == "Assign":
-            if len(node.children) >= 2:
-                lhs = node.children[0]
-                rhs = node.children[1]
-                lhs_type = self._analyze_lhs(lhs, scope, ci)
-                rhs_type = self._analyze_expression(rhs, scope, ci)
-                self._check_assignment_compatibility(lhs_type, rhs_type, node)
-
-        elif t == "IfStatement":
-            cond_expr = node.value
-            if cond_expr is not None:
-                cond_type = self._analyze_expression(cond_expr, scope, ci)
-                self._check_condition_boolean(cond_type, node, is_loop=False)
-
-            for ch in node.children:
-                if isinstance(ch, ASTNode):
-                    self._analyze_statement(ch, scope, ci)
+        handler = self._stmt_dispatch.get(node.type)
+        if handler is not None:
+            handler(node, scope, ci)
+            return
+        for ch in node.children:
+            if ch is not None:
+                self._analyze_statement(ch, scope, ci)
 
-        elif t == "WhileStatement":
-            if node.children:
-                cond_expr = node.children[0]
-                cond_type = self._analyze_expression(cond_expr, scope, ci)
-                self._check_condition_boolean(cond_type, node, is_loop=True)
-            for ch in node.children[1:]:
-                if isinstance(ch, ASTNode):
-                    self._analyze_statement(ch, scope, ci)
+    def _analyze_local_decl(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
+        var = self._field_decl_to_varinfo(node, is_field=False)
+        if var is None:
+            return
+        if not scope.declare(var):
+            self._error("Повторное объявление переменной '{}'", node, var.name)
 
-        elif t == "DoWhileStatement":
-            cond_expr = node.children[0] if len(node.children) >= 1 else None
-            body = node.children[1] if len(node.children) >= 2 else None
+        init_expr = None
+        for ch in node.children:
+            if isinstance(ch, ASTNode) and ch.type == "Init":
+                if ch.children:
+                    init_expr = ch.children[0]
+                break
+        if init_expr is not None:
+            rhs_type = self._analyze_expression(init_expr, scope, ci)
+
+            if var.type.is_array and isinstance(init_expr, ASTNode) and init_expr.type == "ArrayInit":
+                elem_expected = var.type.element_type
+                for elem in init_expr.children:
+                    if isinstance(elem, ASTNode):
+                        elem_type = self._analyze_expression(elem, scope, ci)
+                        self._check_assignment_compatibility(elem_expected, elem_type, elem)
+            else:
+                self._check_assignment_compatibility(var.type, rhs_type, init_expr)
 
-            if body is not None and isinstance(body, ASTNode):
-                self._analyze_statement(body, scope, ci)
-            if cond_expr is not None:
-                cond_type = self._analyze_expression(cond_expr, scope, ci)
-                self._check_condition_boolean(cond_type, node, is_loop=True)
+    def _analyze_expr_stmt(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
+        if node.children:
+            self._analyze_expression(node.children[0], scope, ci)
+
+    def _analyze_assign_stmt(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
+        if len(node.children) >= 2:
+            lhs = node.children[0]
+            rhs = node.children[1]
+            lhs_type = self._analyze_lhs(lhs, scope, ci)
+            rhs_type = self._analyze_expression(rhs, scope, ci)
+            self._check_assignment_compatibility(lhs_type, rhs_type, node)
+
+    def _analyze_if_statement(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
+        cond_expr = node.value
+        if cond_expr is not None:
+            cond_type = self._analyze_expression(cond_expr, scope, ci)
+            self._check_condition_boolean(cond_type, node, is_loop=False)
 
-        elif t == "ForStatement":
-            self._analyze_for_statement(node, scope, ci)
+        for ch in node.children:
+            if isinstance(ch, ASTNode):
+                self._analyze_statement(ch, scope, ci)
 
-        elif t == "Return":
-            self._analyze_return(node, scope, ci)
+    def _analyze_while_statement(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
+        if node.children:
+            cond_expr = node.children[0]
+            cond_type = self._analyze_expression(cond_expr, scope, ci)
+            self._check_condition_boolean(cond_type, node, is_loop=True)
+        for ch in islice(node.children, 1, None):
+            if isinstance(ch, ASTNode):
+                self._analyze_statement(ch, scope, ci)
 
-        elif t == "SwitchStatement":
-            self._analyze_switch_statement(node, scope, ci)
+    def _analyze_do_while_statement(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
+        cond_expr = node.children[0] if len(node.children) >= 1 else None
+        body = node.children[1] if len(node.children) >= 2 else None
 
-        elif t in {"Break", "Continue", "CaseLabel", "DefaultLabel", "TryStatement"}:
-            for ch in node.children:
-                if isinstance(ch, ASTNode):
-                    if ch.type == "Block":
-                        self._analyze_block(ch, scope, ci)
-                    else:
-                        self._analyze_statement(ch, scope, ci)
+        if body is not None and isinstance(body, ASTNode):
+            self._analyze_statement(body, scope, ci)
+        if cond_expr is not None:
+            cond_type = self._analyze_expression(cond_expr, scope, ci)
+            self._check_condition_boolean(cond_type, node, is_loop=True)
 
-        else:
-            for ch in node.children:
-                if isinstance(ch, ASTNode):
+    def _analyze_nested_blocks(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
+        """Break / Continue / CaseLabel / DefaultLabel / TryStatement: вложенные блоки и операторы."""
+        for ch in node.children:
+            if isinstance(ch, ASTNode):
+                if ch.type == "Block":
+                    self._analyze_block(ch, scope, ci)
+                else:
                     self._analyze_statement(ch, scope, ci)
 
     def _analyze_for_statement(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
         """
         1) for(init; cond; update) body
         2) for-each (T x : expr) body
-        """
-        loop_scope = Scope(parent=scope)
-
-        children = [ch for ch in node.children if isinstance(ch, ASTNode)]
-        if not children:
-            return
 
+        Форму задаёт парсер: for-each - ровно [Param, expr, Block],
+        обычный for - [init, cond, update, Block] с None на месте пропущенных частей.
+        """
+        children = node.children
         if (
             len(children) == 3
+            and isinstance(children[0], ASTNode)
             and children[0].type == "Param"
-            and children[2].type == "Block"
             and isinstance(children[0].value, str)
+            and children[1] is not None
+            and isinstance(children[2], ASTNode)
+            and children[2].type == "Block"
         ):
-            param_node = children[0]
-            collection_expr = children[1]
-            body = children[2]
+            self._analyze_foreach_statement(children[0], children[1], children[2], scope, ci)
+        else:
+            self._analyze_classic_for(node, scope, ci)
+
+    def _analyze_foreach_statement(
+        self,
+        param_node: ASTNode,
+        collection_expr: ASTNode,
+        body: ASTNode,
+        scope: Scope,
+        ci: ClassInfo,
+    ) -> None:
+        loop_scope = Scope(parent=scope)
 
-            parts = param_node.value.strip().split()
-            if parts:
-                type_str = " ".join(parts[:-1]) if len(parts) > 1 else parts[0]
-                name = parts[-1]
-                var_type = self._parse_type(type_str)
-                var = VarInfo(name=name, type=var_type, is_field=False, is_param=False)
-                if not loop_scope.declare(var):
-                    self._error(f"Повторное объявление переменной '{name}' в заголовке цикла for-each", param_node)
+        type_str, _, name = param_node.value.strip().rpartition(" ")
+        if name:
+            var_type = self._parse_type(type_str or name)
+            var = VarInfo(name=name, type=var_type, is_field=False, is_param=False)
+            if not loop_scope.declare(var):
+                self._error("Повторное объявление переменной '{}' в заголовке цикла for-each", param_node, name)
 
-                coll_type = self._analyze_expression(collection_expr, loop_scope, ci)
+            coll_type = self._analyze_expression(collection_expr, loop_scope, ci)
 
-                if not coll_type.is_unknown:
-                    elem_type = TypeInfo("Unknown")
-                    if coll_type.is_array or coll_type.is_list:
-                        elem_type = coll_type.element_type
+            if not coll_type.is_unknown:
+                elem_type = TypeInfo.of("Unknown")
+                if coll_type.is_array or coll_type.is_list:
+                    elem_type = coll_type.element_type
 
-                    if not elem_type.is_unknown:
-                        self._check_assignment_compatibility(var_type, elem_type, collection_expr)
+                if not elem_type.is_unknown:
+                    self._check_assignment_compatibility(var_type, elem_type, collection_expr)
 
-            self._analyze_block(body, loop_scope, ci)
+        self._analyze_block(body, loop_scope, ci)
+
+    def _analyze_classic_for(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> None:
+        loop_scope = Scope(parent=scope)
+
+        children = [ch for ch in node.children if isinstance(ch, ASTNode)]
+        if not children:
             return
-    
+
         body = None
         for ch in reversed(children):
             if ch.type == "Block":
                 body = ch
                 break
 
+        # объявления в init и условие - за один проход
+        cond_expr = None
+        before_body = True
         for ch in children:
             if ch is body:
+                before_body = False
                 continue
             if ch.type == "FieldDecl":
                 var = self._field_decl_to_varinfo(ch, is_field=False)
                 if var is not None:
                     if not loop_scope.declare(var):
-                        self._error(f"Повторное объявление переменной '{var.name}'", ch)
+                        self._error("Повторное объявление переменной '{}'", ch, var.name)
                     init_expr = None
                     for sub in ch.children:
                         if isinstance(sub, ASTNode) and sub.type == "Init" and sub.children:
@@ -523,14 +820,9 @@ class SemanticAnalyzer:
                     if init_expr is not None:
                         rhs_type = self._analyze_expression(init_expr, loop_scope, ci)
                         self._check_assignment_compatibility(var.type, rhs_type, init_expr)
-
-        cond_expr = None
-        for ch in children:
-            if ch is body:
-                break
-            if ch.type not in {"FieldDecl", "Block"}:
+            elif before_body and cond_expr is None and ch.type != "Block":
                 cond_expr = ch
-                break
+
         if cond_expr is not None:
             cond_type = self._analyze_expression(cond_expr, loop_scope, ci)
             self._check_condition_boolean(cond_type, node, is_loop=True)
@@ -564,7 +856,7 @@ class SemanticAnalyzer:
             return
 
         if expr is None:
-            self._error(f"Метод с типом {ret_type} должен возвращать значение", node)
+            self._error("Метод с типом {} должен возвращать значение", node, ret_type)
             return
 
         if expr_type is not None:
@@ -577,29 +869,14 @@ class SemanticAnalyzer:
             return
 
         switch_expr = node.children[0]
-        switch_type = TypeInfo("Unknown")
+        switch_type = TypeInfo.of("Unknown")
         if isinstance(switch_expr, ASTNode):
             switch_type = self._analyze_expression(switch_expr, scope, ci)
 
         if not switch_type.is_unknown and switch_type.is_boolean:
             self._error("switch по boolean не поддерживается", switch_expr)
 
-        def _types_compatible_for_switch(sw_type: TypeInfo, case_type: TypeInfo) -> bool:
-            """
-            Логика намеренно упрощена:
-            - если один из типов Unknown — не генерируем дополнительную ошибку;
-            - если имена типов совпадают — считаем совместимыми;
-            - если оба типа числовые — считаем совместимыми.
-            """
-            if sw_type.is_unknown or case_type.is_unknown:
-                return True
-            if sw_type.name == case_type.name:
-                return True
-            if sw_type.is_numeric and case_type.is_numeric:
-                return True
-            return False
-
-        for case_node in node.children[1:]:
+        for case_node in islice(node.children, 1, None):
             if not isinstance(case_node, ASTNode):
                 continue
 
@@ -610,13 +887,13 @@ class SemanticAnalyzer:
                 case_expr = case_node.children[0]
                 case_type = self._analyze_expression(case_expr, scope, ci)
 
-                if not _types_compatible_for_switch(switch_type, case_type):
+                if not self._types_compatible_for_switch(switch_type, case_type):
                     self._error(
-                        f"Тип выражения в case не согласован с типом switch: {switch_type} и {case_type}",
-                        case_node,
+                        "Тип выражения в case не согласован с типом switch: {} и {}",
+                        case_node, switch_type, case_type,
                     )
 
-                for stmt in case_node.children[1:]:
+                for stmt in islice(case_node.children, 1, None):
                     if isinstance(stmt, ASTNode):
                         self._analyze_statement(stmt, scope, ci)
 
@@ -646,11 +923,11 @@ class SemanticAnalyzer:
                 field_name = node.children[1].value
 
             if base_type.is_unknown or field_name is None:
-                return TypeInfo("Unknown")
+                return TypeInfo.of("Unknown")
 
             field_type = self._resolve_field_type(base_type.name, field_name)
             if field_type is None:
-                return TypeInfo("Unknown")
+                return TypeInfo.of("Unknown")
             return field_type
 
         return self._analyze_expression(node, scope, ci)
@@ -658,81 +935,68 @@ class SemanticAnalyzer:
     # ---------- Анализ выражений ----------
 
     def _analyze_expression(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
-        t = node.type
-
-        if t == "Literal":
-            return self._infer_literal_type(node)
-
-        if t == "Identifier":
-            name = str(node.value)
-
-            if name == "this":
-                if self._current_method is not None and self._current_method.is_static:
-                    self._error("Нельзя использовать this в статическом методе", node)
-                    return TypeInfo("Unknown")
-                return TypeInfo(ci.name)
+        if self._errors_exhausted:
+            return _UNKNOWN
+        handler = self._expr_dispatch.get(node.type)
+        if handler is not None:
+            return handler(node, scope, ci)
+        for ch in node.children:
+            if ch is not None:
+                self._analyze_expression(ch, scope, ci)
+        return TypeInfo.of("Unknown")
 
-            if name == "super":
-                if self._current_method is not None and self._current_method.is_static:
-                    self._error("Нельзя использовать super в статическом методе", node)
-                    return TypeInfo("Unknown")
-                if ci.super_name:
-                    return TypeInfo(ci.super_name)
-                return TypeInfo("Unknown")
+    def _analyze_literal(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
+        return self._infer_literal_type(node)
 
-            if name == "System":
-                return TypeInfo("Unknown")
+    def _analyze_identifier(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
+        name = str(node.value)
 
+        # обычный идентификатор - сразу в таблицу символов
+        if name not in _SPECIAL_IDENTIFIERS:
             var = scope.resolve(name)
             if var is None:
-                self._error(f"Идентификатор '{name}' не объявлен", node)
-                return TypeInfo("Unknown")
+                self._error("Идентификатор '{}' не объявлен", node, name)
+                return TypeInfo.of("Unknown")
             return var.type
 
-        if t == "Member":
-            return self._analyze_lhs(node, scope, ci)
-
-        if t == "ArrayInit":
-            for ch in node.children:
-                if isinstance(ch, ASTNode):
-                    self._analyze_expression(ch, scope, ci)
-            return TypeInfo("Unknown")
-        
-        if t == "BinaryOp":
-            return self._analyze_binary_op(node, scope, ci)
-
-        if t == "PrefixOp":
-            return self._analyze_prefix_op(node, scope, ci)
+        if name == "this":
+            if self._current_method is not None and self._current_method.is_static:
+                self._error("Нельзя использовать this в статическом методе", node)
+                return TypeInfo.of("Unknown")
+            return TypeInfo.of(ci.name)
 
-        if t == "PostfixOp":
-            return self._analyze_postfix_op(node, scope, ci)
-
-        if t == "Ternary":
-            return self._analyze_ternary(node, scope, ci)
-
-        if t == "Call":
-            return self._analyze_call(node, scope, ci)
+        if name == "super":
+            if self._current_method is not None and self._current_method.is_static:
+                self._error("Нельзя использовать super в статическом методе", node)
+                return TypeInfo.of("Unknown")
+            if ci.super_name:
+                return TypeInfo.of(ci.super_name)
+            return TypeInfo.of("Unknown")
 
-        if t == "Assign":
-            if len(node.children) >= 2:
-                lhs_type = self._analyze_lhs(node.children[0], scope, ci)
-                rhs_type = self._analyze_expression(node.children[1], scope, ci)
-                self._check_assignment_compatibility(lhs_type, rhs_type, node)
-                return lhs_type
-            return TypeInfo("Unknown")
+        # System
+        return TypeInfo.of("Unknown")
 
+    def _analyze_array_init(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
         for ch in node.children:
-            if isinstance(ch, ASTNode):
+            if ch is not None:
                 self._analyze_expression(ch, scope, ci)
-        return TypeInfo("Unknown")
+        return TypeInfo.of("Unknown")
+
+    def _analyze_assign_expr(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
+        if len(node.children) >= 2:
+            lhs_type = self._analyze_lhs(node.children[0], scope, ci)
+            rhs_type = self._analyze_expression(node.children[1], scope, ci)
+            self._check_assignment_compatibility(lhs_type, rhs_type, node)
+            return lhs_type
+        return TypeInfo.of("Unknown")
 
     def _analyze_binary_op(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
-        op = str(node.value) if node.value is not None else ""
-        left_type = self._analyze_expression(node.children[0], scope, ci) if node.children else TypeInfo("Unknown")
-        right_type = self._analyze_expression(node.children[1], scope, ci) if len(node.children) > 1 else TypeInfo("Unknown")
+        op = node.value or ""
+        left_type = self._analyze_expression(node.children[0], scope, ci) if node.children else TypeInfo.of("Unknown")
+        right_type = self._analyze_expression(node.children[1], scope, ci) if len(node.children) > 1 else TypeInfo.of("Unknown")
 
         if left_type.is_unknown or right_type.is_unknown:
-            return TypeInfo("Unknown")
+            return TypeInfo.of("Unknown")
 
         if op in {"ADD", "SUB", "MUL", "DIV", "MOD"}:
             if left_type.is_numeric and right_type.is_numeric:
@@ -740,138 +1004,142 @@ class SemanticAnalyzer:
             if op == "ADD" and left_type.is_string and right_type.is_string:
                 return left_type
             self._error(
-                f"Несовпадение типов операндов бинарного оператора '{op}': {left_type} и {right_type}",
-                node,
+                "Несовпадение типов операндов бинарного оператора '{}': {} и {}",
+                node, op, left_type, right_type,
             )
-            return TypeInfo("Unknown")
+            return TypeInfo.of("Unknown")
 
         if op in {"LT", "GT", "LE", "GE", "EQ", "NE"}:
-            if left_type.name == right_type.name or (left_type.is_numeric and right_type.is_numeric):
-                return TypeInfo("boolean")
+            if left_type == right_type or (left_type.is_numeric and right_type.is_numeric):
+                return TypeInfo.of("boolean")
             self._error(
-                f"Несовпадение типов операндов бинарного оператора '{op}': {left_type} и {right_type}",
-                node,
+                "Несовпадение типов операндов бинарного оператора '{}': {} и {}",
+                node, op, left_type, right_type,
             )
-            return TypeInfo("boolean")
+            return TypeInfo.of("boolean")
 
         if op in {"AND", "OR"}:
             if left_type.is_boolean and right_type.is_boolean:
-                return TypeInfo("boolean")
+                return TypeInfo.of("boolean")
             self._error(
-                f"Логический оператор '{op}' применим только к boolean, получены {left_type} и {right_type}",
-                node,
+                "Логический оператор '{}' применим только к boolean, получены {} и {}",
+                node, op, left_type, right_type,
             )
-            return TypeInfo("boolean")
+            return TypeInfo.of("boolean")
 
         if op in {"BITAND", "BITOR", "CARET", "LSHIFT", "RSHIFT", "URSHIFT"}:
             if left_type.is_numeric and right_type.is_numeric:
                 return left_type
             self._error(
-                f"Побитовый оператор '{op}' применим только к числовым типам, получены {left_type} и {right_type}",
-                node,
+                "Побитовый оператор '{}' применим только к числовым типам, получены {} и {}",
+                node, op, left_type, right_type,
             )
-            return TypeInfo("Unknown")
+            return TypeInfo.of("Unknown")
 
-        return TypeInfo("Unknown")
+        return TypeInfo.of("Unknown")
 
     def _analyze_prefix_op(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
-        op = str(node.value) if node.value is not None else ""
+        op = node.value or ""
         expr = node.children[0] if node.children else None
-        inner_type = self._analyze_expression(expr, scope, ci) if expr is not None else TypeInfo("Unknown")
+        inner_type = self._analyze_expression(expr, scope, ci) if expr is not None else TypeInfo.of("Unknown")
 
         if op in {"INC", "DEC"}:
             if inner_type.is_unknown:
-                return TypeInfo("Unknown")
+                return TypeInfo.of("Unknown")
             if not inner_type.is_numeric:
-                self._error(f"Оператор {op} применим только к числовым типам, получен {inner_type}", node)
-                return TypeInfo("Unknown")
+                self._error("Оператор {} применим только к числовым типам, получен {}", node, op, inner_type)
+                return TypeInfo.of("Unknown")
             return inner_type
 
         if op in {"PLUS", "MINUS"}:
             if inner_type.is_numeric or inner_type.is_unknown:
                 return inner_type
-            self._error(f"Унарный оператор {op} применим только к числовым типам, получен {inner_type}", node)
-            return TypeInfo("Unknown")
+            self._error("Унарный оператор {} применим только к числовым типам, получен {}", node, op, inner_type)
+            return TypeInfo.of("Unknown")
 
         if op == "NOT":
             if inner_type.is_unknown or inner_type.is_boolean:
-                return TypeInfo("boolean")
-            self._error(f"Унарный оператор '!' применим только к boolean, получен {inner_type}", node)
-            return TypeInfo("boolean")
+                return TypeInfo.of("boolean")
+            self._error("Унарный оператор '!' применим только к boolean, получен {}", node, inner_type)
+            return TypeInfo.of("boolean")
 
         return inner_type
 
     def _analyze_postfix_op(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
-        op = str(node.value) if node.value is not None else ""
+        op = node.value or ""
         expr = node.children[0] if node.children else None
-        inner_type = self._analyze_expression(expr, scope, ci) if expr is not None else TypeInfo("Unknown")
+        inner_type = self._analyze_expression(expr, scope, ci) if expr is not None else TypeInfo.of("Unknown")
 
         if op in {"INC", "DEC"}:
             if inner_type.is_unknown:
-                return TypeInfo("Unknown")
+                return TypeInfo.of("Unknown")
             if not inner_type.is_numeric:
-                self._error(f"Оператор {op} применим только к числовым типам, получен {inner_type}", node)
-                return TypeInfo("Unknown")
+                self._error("Оператор {} применим только к числовым типам, получен {}", node, op, inner_type)
+                return TypeInfo.of("Unknown")
             return inner_type
 
         return inner_type
 
     def _analyze_ternary(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
+        if self._errors_exhausted:
+            return _UNKNOWN
+        analyze = self._analyze_expression
         if len(node.children) < 3:
             for ch in node.children:
                 if isinstance(ch, ASTNode):
-                    self._analyze_expression(ch, scope, ci)
-            return TypeInfo("Unknown")
+                    analyze(ch, scope, ci)
+            return _UNKNOWN
 
         cond_node = node.children[0]
         then_node = node.children[1]
         else_node = node.children[2]
 
-        cond_type = self._analyze_expression(cond_node, scope, ci)
+        cond_type = analyze(cond_node, scope, ci)
         if not cond_type.is_unknown and not cond_type.is_boolean:
             self._error(
-                f"Условие тернарного оператора должно иметь тип boolean, получено {cond_type}",
-                node,
+                "Условие тернарного оператора должно иметь тип boolean, получено {}",
+                node, cond_type,
             )
 
-        then_type = self._analyze_expression(then_node, scope, ci)
-        else_type = self._analyze_expression(else_node, scope, ci)
+        then_type = analyze(then_node, scope, ci)
+        else_type = analyze(else_node, scope, ci)
 
-        if then_type.is_unknown or else_type.is_unknown:
-            return TypeInfo("Unknown")
-
-        if then_type.name == else_type.name:
+        # одинаковые ветви (в том числе обе Unknown)
+        if then_type == else_type:
             return then_type
 
+        if then_type.is_unknown or else_type.is_unknown:
+            return _UNKNOWN
+
         if then_type.is_numeric and else_type.is_numeric:
             return then_type
 
         self._error(
-            f"Ветви тернарного оператора имеют несовместимые типы: {then_type} и {else_type}",
-            node,
+            "Ветви тернарного оператора имеют несовместимые типы: {} и {}",
+            node, then_type, else_type,
         )
-        return TypeInfo("Unknown")
+        return _UNKNOWN
 
     def _analyze_call(self, node: ASTNode, scope: Scope, ci: ClassInfo) -> TypeInfo:
-        arg_types: List[TypeInfo] = [
-            self._analyze_expression(arg, scope, ci) for arg in node.children
-        ]
-
-        def types_compatible(expected: TypeInfo, actual: TypeInfo) -> bool:
-            if expected.is_unknown or actual.is_unknown:
-                return True
-            if (
-                expected.is_primitive
-                or expected.is_string
-                or actual.is_primitive
-                or actual.is_string
-            ):
-                return expected.name == actual.name
-            return True
+        if self._errors_exhausted:
+            return _UNKNOWN
+        analyze = self._analyze_expression
+        classes_get = self.classes.get
+
+        # аргументы разбираются прямо через таблицу обработчиков, минуя
+        # лишний кадр _analyze_expression на каждый аргумент
+        expr_get = self._expr_dispatch.get
+        arg_types: List[TypeInfo] = []
+        for arg in node.children:
+            handler = expr_get(arg.type)
+            if handler is not None:
+                arg_types.append(handler(arg, scope, ci))
+            else:
+                arg_types.append(analyze(arg, scope, ci))
 
         callee = node.value
         if not isinstance(callee, ASTNode):
-            return TypeInfo("Unknown")
+            return _UNKNOWN
 
         method_name: Optional[str] = None
         base_expr: Optional[ASTNode] = None
@@ -880,7 +1148,7 @@ class SemanticAnalyzer:
             # f(...)
             name = str(callee.value)
             if name in {"this", "super"}:
-                return TypeInfo("Unknown")
+                return _UNKNOWN
             method_name = name
             base_expr = None
 
@@ -892,11 +1160,11 @@ class SemanticAnalyzer:
                 base_expr = callee.children[0]
 
         else:
-            base_expr_type = self._analyze_expression(callee, scope, ci)
-            return TypeInfo("Unknown")
+            base_expr_type = analyze(callee, scope, ci)
+            return _UNKNOWN
 
         if not method_name:
-            return TypeInfo("Unknown")
+            return _UNKNOWN
         target_class: Optional[ClassInfo] = None
 
         if base_expr is None:
@@ -909,146 +1177,142 @@ class SemanticAnalyzer:
             elif base_name == "super":
                 # super.f(...)
                 if ci.super_name:
-                    target_class = self.classes.get(ci.super_name)
+                    target_class = classes_get(ci.super_name)
                     if target_class is None:
-                        return TypeInfo("Unknown")
+                        return _UNKNOWN
                 else:
                     self._error("Вызов super в классе без базового класса", base_expr)
-                    return TypeInfo("Unknown")
+                    return _UNKNOWN
             else:
                 # obj.f(...)
                 var = scope.resolve(base_name)
                 if var is None or var.type.is_unknown:
-                    return TypeInfo("Unknown")
-                target_class = self.classes.get(var.type.name)
+                    return _UNKNOWN
+                target_class = classes_get(var.type.name)
                 if target_class is None:
-                    return TypeInfo("Unknown")
+                    return _UNKNOWN
 
         else:
-            base_type = self._analyze_expression(base_expr, scope, ci)
+            base_type = analyze(base_expr, scope, ci)
             if base_type.is_unknown:
-                return TypeInfo("Unknown")
-            target_class = self.classes.get(base_type.name)
+                return _UNKNOWN
+            target_class = classes_get(base_type.name)
             if target_class is None:
-                return TypeInfo("Unknown")
+                return _UNKNOWN
 
         if target_class is None:
-            return TypeInfo("Unknown")
-
-        candidates: List[MethodInfo] = []
-        current: Optional[ClassInfo] = target_class
-        visited: set[str] = set()
+            return _UNKNOWN
+
+        # на горячем пути перегрузки нужной арности берутся одним обращением
+        # к кэшу; полный список кандидатов нужен только при промахе и для ошибок
+        arity = len(arg_types)
+        arity_key = (target_class.name, method_name, arity)
+        same_arity = self._arity_cache.get(arity_key)
+        if same_arity is None:
+            same_arity = [
+                m for m in self._lookup_methods(target_class, method_name)
+                if m.arity == arity
+            ]
+            self._arity_cache[arity_key] = same_arity
 
-        while current is not None and current.name not in visited:
-            visited.add(current.name)
-            methods_here = current.methods.get(method_name)
-            if methods_here:
-                candidates.extend(methods_here)
-            if not current.super_name:
-                break
-            current = self.classes.get(current.super_name)
-
-        if not candidates:
-            self._error(
-                f"Метод '{method_name}' не найден в классе '{target_class.name}'",
-                node,
-            )
-            return TypeInfo("Unknown")
-
-        same_arity = [m for m in candidates if len(m.param_types) == len(arg_types)]
         if not same_arity:
+            candidates = self._lookup_methods(target_class, method_name)
+            if not candidates:
+                self._error(
+                    "Метод '{}' не найден в классе '{}'",
+                    node, method_name, target_class.name,
+                )
+                return _UNKNOWN
             self._error(
-                f"Несоответствие числа аргументов при вызове '{method_name}': "
-                f"ожидалось {len(candidates[0].param_types)}, получено {len(arg_types)}",
-                node,
+                "Несоответствие числа аргументов при вызове '{}': ожидалось {}, получено {}",
+                node, method_name, candidates[0].arity, arity,
             )
-            return TypeInfo("Unknown")
-
-        def fmt_types(types: List[TypeInfo]) -> str:
-            return ", ".join(t.name for t in types) if types else ""
-
-        for m in same_arity:
-            ok = True
-            for expected, actual in zip(m.param_types, arg_types):
-                if not types_compatible(expected, actual):
-                    ok = False
-                    break
-            if ok:
-                return m.return_type
-
-        expected_sig = fmt_types(same_arity[0].param_types)
-        actual_sig = fmt_types(arg_types)
+            return _UNKNOWN
+
+        return_type = _resolve_overload(same_arity, arg_types)
+        if return_type is not None:
+            return return_type
+
+        # сигнатура вызова собирается только для сообщения об ошибке
+        actual_sig = ", ".join(t.name for t in arg_types)
         self._error(
-            f"Несовпадение типов аргументов при вызове '{method_name}': "
-            f"ожидалось ({expected_sig}), получено ({actual_sig})",
-            node,
+            "Несовпадение типов аргументов при вызове '{}': ожидалось ({}), получено ({})",
+            node, method_name, same_arity[0].signature, actual_sig,
         )
-        return TypeInfo("Unknown")
+        return _UNKNOWN
 
 
     # ---------- Вспомогательные проверки ----------
 
-    def _check_assignment_compatibility(self, target: TypeInfo, rhs: TypeInfo, node: ASTNode) -> None:
-        if target.is_unknown or rhs.is_unknown:
-            return
+    @staticmethod
+    def _types_compatible_for_switch(sw_type: TypeInfo, case_type: TypeInfo) -> bool:
+        """
+        Логика намеренно упрощена:
+        - если один из типов Unknown — не генерируем дополнительную ошибку;
+        - если имена типов совпадают — считаем совместимыми;
+        - если оба типа числовые — считаем совместимыми.
+        """
+        if sw_type.is_unknown or case_type.is_unknown:
+            return True
+        if sw_type == case_type:
+            return True
+        if sw_type.is_numeric and case_type.is_numeric:
+            return True
+        return False
 
-        if target.is_primitive or target.is_string or rhs.is_primitive or rhs.is_string:
-            if target.name != rhs.name:
-                self._error(
-                    f"Несовпадение типов при присваивании: слева {target}, справа {rhs}",
-                    node,
-                )
+    def _check_assignment_compatibility(self, target: TypeInfo, rhs: TypeInfo, node: ASTNode) -> None:
+        # один и тот же объект - одно и то же имя, присваивание допустимо
+        if target is rhs:
             return
-        return
+        if not _arg_type_compatible(target, rhs):
+            self._error(
+                "Несовпадение типов при присваивании: слева {}, справа {}",
+                node, target, rhs,
+            )
 
     def _check_condition_boolean(self, cond_type: TypeInfo, node: ASTNode, *, is_loop: bool) -> None:
         if cond_type.is_unknown:
             return
         if not cond_type.is_boolean:
             if is_loop:
-                self._error(f"Условие цикла должно иметь тип boolean, получено {cond_type}", node)
+                self._error("Условие цикла должно иметь тип boolean, получено {}", node, cond_type)
             else:
-                self._error(f"Условие if должно иметь тип boolean, получено {cond_type}", node)
+                self._error("Условие if должно иметь тип boolean, получено {}", node, cond_type)
 
     # ---------- Разбор типов и литералов ----------
 
     def _parse_type(self, type_str: str) -> TypeInfo:
-        type_str = type_str.strip()
-        if not type_str:
-            return TypeInfo("Unknown")
-        return TypeInfo(type_str)
+        return _parse_type_str(type_str)
 
     def _infer_literal_type(self, node: ASTNode) -> TypeInfo:
-        text = str(node.value)
-
-        if text == "true" or text == "false":
-            return TypeInfo("boolean")
+        return _literal_type(str(node.value))
 
-        if text == "null":
-            return TypeInfo("null")
-
-        if (text.startswith('"') and text.endswith('"')) or (text.startswith("'") and text.endswith("'") and len(text) >= 3):
-            if text.startswith('"'):
-                return TypeInfo("String")
-            return TypeInfo("char")
-
-        num = text
-        if num[-1:] in "lLfFdD":
-            num = num[:-1]
+    def _lookup_methods(self, target_class: ClassInfo, method_name: str) -> List[MethodInfo]:
+        """
+        Перегрузки метода в классе и его предках. Классы и сигнатуры
+        регистрируются до анализа тел, поэтому результат кэшируется.
+        """
+        key = (target_class.name, method_name)
+        candidates = self._method_cache.get(key)
+        if candidates is not None:
+            return candidates
 
-        try:
-            int(num)
-            return TypeInfo("int")
-        except ValueError:
-            pass
+        candidates = []
+        current: Optional[ClassInfo] = target_class
+        # иерархии неглубокие - линейный поиск по списку дешевле множества
+        visited: List[str] = []
 
-        try:
-            float(num)
-            return TypeInfo("double")
-        except ValueError:
-            pass
+        while current is not None and current.name not in visited:
+            visited.append(current.name)
+            methods_here = current.methods.get(method_name)
+            if methods_here:
+                candidates.extend(methods_here)
+            if not current.super_name:
+                break
+            current = self.classes.get(current.super_name)
 
-        return TypeInfo("Unknown")
+        self._method_cache[key] = candidates
+        return candidates
 
     def _resolve_field_type(self, class_name: str, field_name: str) -> Optional[TypeInfo]:
         ci = self.classes.get(class_name)
@@ -1061,5 +1325,16 @@ class SemanticAnalyzer:
 
     # ---------- Регистрация ошибок ----------
 
-    def _error(self, msg: str, node: Optional[ASTNode] = None) -> None:
-        self.errors.append(SemanticError(msg, node))
+    def _error(self, msg: str, node: Optional[ASTNode] = None, *fmt_args: object) -> None:
+        if self._errors_exhausted:
+            return
+        limit = self.error_limit
+        if limit is not None and len(self.errors) >= limit:
+            # эта ошибка уже не помещается: список обрывается, и последней записью
+            # об этом сообщается явно
+            self._errors_exhausted = True
+            self.errors.append(SemanticError(
+                "Слишком много ошибок: анализ остановлен после {}", None, limit,
+            ))
+            return
+        self.errors.append(SemanticError(msg, node, *fmt_args))
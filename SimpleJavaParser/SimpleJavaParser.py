@@ -1,47 +1,92 @@
-from typing import Optional
+from typing import Any, Callable, Dict, Final, List, Optional, Sequence, Tuple
 from Token import Token
 
+# общий пустой список детей для листьев; изменяемый список заводит _mutable_children()
+_NO_CHILDREN: Tuple[()] = ()
+
+
 class ASTNode:
-    def __init__(self, type_, value=None, children=None, token=None):
+    # Инвариант: children содержит только ASTNode; None встречается лишь на месте
+    # пропущенных частей заголовка for (init / cond / update).
+    # У узлов, созданных без children, это общий пустой кортеж.
+    # У BinaryOp / PrefixOp / PostfixOp в value лежит тип токена оператора (строка).
+
+    # фиксированный набор полей: быстрее доступ к атрибутам и меньше памяти на узел
+    __slots__ = ("type", "value", "children", "token", "line", "column")
+
+    def __init__(
+        self,
+        type_: str,
+        value: Any = None,
+        children: Optional[Sequence[Optional["ASTNode"]]] = None,
+        token: Optional[Token] = None,
+    ) -> None:
         self.type = type_
         self.value = value
-        self.children = children or []
+        self.children: Sequence[Optional[ASTNode]] = children if children is not None else _NO_CHILDREN
         self.token = token
+        # у Token поля line/column объявлены в __slots__ и всегда заданы
         if token is not None:
-            self.line = getattr(token, "line", None)
-            self.column = getattr(token, "column", None)
+            self.line: Optional[int] = token.line
+            self.column: Optional[int] = token.column
         else:
+            # позиция берётся у первого ребёнка с токеном; по инварианту дети - ASTNode или None
             inherited_token = None
             for ch in self.children:
-                if isinstance(ch, ASTNode) and getattr(ch, "token", None) is not None:
+                if ch is not None and ch.token is not None:
                     inherited_token = ch.token
                     break
             if inherited_token is not None:
                 self.token = inherited_token
-                self.line = getattr(inherited_token, "line", None)
-                self.column = getattr(inherited_token, "column", None)
+                self.line = inherited_token.line
+                self.column = inherited_token.column
             else:
                 self.line = None
                 self.column = None
 
     def __repr__(self, level=0):
-        indent = "  " * level
-        s = f"{indent}{self.type}"
-        if self.value is not None:
-            s += f": {self.value}"
-        for child in self.children:
-            if isinstance(child, ASTNode):
-                s += "\n" + child.__repr__(level + 1)
-            else:
-                s += "\n" + ("  " * (level + 1)) + repr(child)
-        return s
+        # обход явным стеком с одним буфером: без рекурсии и квадратичной склейки строк
+        indents = _INDENTS
+        parts = []
+        stack = [(self, level)]
+        while stack:
+            node, lvl = stack.pop()
+            if parts:
+                parts.append("\n")
+            while lvl >= len(indents):
+                indents.append("  " * len(indents))
+            parts.append(indents[lvl])
+            if not isinstance(node, ASTNode):
+                parts.append(repr(node))
+                continue
+            parts.append(node.type)
+            if node.value is not None:
+                parts.append(f": {node.value}")
+            for child in reversed(node.children):
+                stack.append((child, lvl + 1))
+        return "".join(parts)
+
+
+def _mutable_children(node: ASTNode) -> List[Optional[ASTNode]]:
+    """Список детей узла, пригодный для изменения (общий пустой кортеж заменяется списком)."""
+    children = node.children
+    if not isinstance(children, list):
+        children = node.children = list(children)
+    return children
+
+
+# отступы для __repr__ по уровню вложенности, дополняются по мере надобности
+_INDENTS: List[str] = ["  " * i for i in range(32)]
 
 
 class SimpleJavaParser:
-    IGNORED = {"COMMENT", "LINE_COMMENT", "WS"}
-    MODIFIERS = {"PUBLIC", "PRIVATE", "PROTECTED", "STATIC", "FINAL", "ABSTRACT"}
-    TYPE_KEYWORDS = {"INT", "FLOAT", "DOUBLE", "BOOLEAN", "CHAR", "VOID", "STRING"}
-    PRECEDENCE = {
+    IGNORED: Final = frozenset({"COMMENT", "LINE_COMMENT", "WS"})
+    MODIFIERS: Final = frozenset({"PUBLIC", "PRIVATE", "PROTECTED", "STATIC", "FINAL", "ABSTRACT"})
+    TYPE_KEYWORDS: Final = frozenset({"INT", "FLOAT", "DOUBLE", "BOOLEAN", "CHAR", "VOID", "STRING"})
+    # границы тела switch и ветки case/default; EOF - чтобы незакрытый switch не зацикливал разбор
+    SWITCH_STOP: Final = frozenset({"RBRACE", Token.EOF})
+    SWITCH_CASE_STOP: Final = frozenset({"CASE", "DEFAULT", "RBRACE", Token.EOF})
+    PRECEDENCE: Final = {
         "MUL": 60, "DIV": 60, "MOD": 60,
         "ADD": 50, "SUB": 50,
         "GT": 40, "LT": 40, "GE": 40, "LE": 40,
@@ -51,107 +96,176 @@ class SimpleJavaParser:
         "LSHIFT": 5, "RSHIFT": 5, "URSHIFT": 5,
     }
 
+    # Листовые узлы без позиции и детей разделяются между всеми местами дерева;
+    # последующие проходы их не изменяют (AstOptimizer меняет только списки детей родителей).
+    _BREAK: Final = ASTNode("Break")
+    _CONTINUE: Final = ASTNode("Continue")
+    # составное присваивание -> бинарный оператор
+    COMPOUND_ASSIGN: Final = {
+        "ADD_ASSIGN": "ADD",
+        "SUB_ASSIGN": "SUB",
+        "MUL_ASSIGN": "MUL",
+        "DIV_ASSIGN": "DIV",
+        "MOD_ASSIGN": "MOD",
+        "AND_ASSIGN": "BITAND",
+        "OR_ASSIGN":  "BITOR",
+        "XOR_ASSIGN": "CARET",
+        "LSHIFT_ASSIGN": "LSHIFT",
+        "RSHIFT_ASSIGN": "RSHIFT",
+        "URSHIFT_ASSIGN": "URSHIFT",
+    }
+
     def __init__(self, tokens):
         self.tokens = tokens
-        self.current = self.tokens.LT(1)
+        # Поток уже полностью буферизован (TokenStream.tokens, последний - EOF):
+        # парсер читает список по своему индексу, без вызовов LT()/consume() на каждый токен.
+        # Позиция самого TokenStream при этом не сдвигается.
+        self._toks: List[Token] = tokens.tokens
+        self._i: int = tokens.pos
+        self._last: int = len(self._toks) - 1
+        self.current: Token = self._toks[self._i] if self._i <= self._last else self._toks[-1]
         self._skip_ignored()
         self._current_class_name: Optional[str] = None
+        # (позиция, результат) последнего вызова _member_head_index
+        self._member_head: Tuple[int, int] = (-1, 1)
+        # последовательность модификаторов -> общий узел Modifiers; живёт один разбор,
+        # поэтому входные данные не раздувают таблицу в долгоживущем процессе
+        self._modifiers_nodes: Dict[Tuple[str, ...], ASTNode] = {}
+
+        # первый токен оператора -> разбор; прочие операторы - объявления и выражения
+        self._stmt_dispatch: Dict[str, Callable[[], ASTNode]] = {
+            "IF": self.parse_if_statement,
+            "SWITCH": self.parse_switch_statement,
+            "FOR": self.parse_for_statement,
+            "WHILE": self.parse_while_statement,
+            "DO": self.parse_do_while_statement,
+            "TRY": self.parse_try_statement,
+            "BREAK": self.parse_break_statement,
+            "CONTINUE": self.parse_continue_statement,
+            "RETURN": self.parse_return_statement,
+            "LBRACE": self.parse_block_statement,
+        }
 
     # --------------- utilities ---------------
-    def _skip_ignored(self):
-        while self.current is not None and getattr(self.current, "type", None) in self.IGNORED:
-            self.tokens.consume()
-            self.current = self.tokens.LT(1)
-
-    def advance(self):
-        self.tokens.consume()
-        self.current = self.tokens.LT(1)
-        self._skip_ignored()
-
-    def match(self, expected_type: str):
-        if (self.current is None) or (self.current.type == Token.EOF and expected_type != Token.EOF):
+    def _skip_ignored(self) -> None:
+        ignored = self.IGNORED
+        toks = self._toks
+        while self.current.type in ignored:
+            if self._i < self._last:
+                self._i += 1
+            self.current = toks[self._i]
+
+    def advance(self) -> None:
+        if self._i < self._last:
+            self._i += 1
+        self.current = self._toks[self._i]
+        if self.current.type in self.IGNORED:
+            self._skip_ignored()
+
+    def match(self, expected_type: str) -> None:
+        if self.current.type == Token.EOF and expected_type != Token.EOF:
             raise SyntaxError(f"Ожидался {expected_type}, получен EOF")
         if self.current.type != expected_type:
             raise SyntaxError(f"Ожидался {expected_type}, получен {self.current.type}")
         self.advance()
 
     def accept(self, expected_type: str) -> bool:
-        if self.current is not None and self.current.type == expected_type:
+        if self.current.type == expected_type:
             self.advance()
             return True
         return False
 
-    def peek_type(self, k=1):
-        t = self.tokens.LT(k)
-        return t.type if t is not None else None
+    def peek_type(self, k: int = 1):
+        return self._peek_token(k).type
 
-    def _peek_token(self, k: int):
-        try:
-            return self.tokens.LT(k)
-        except Exception:
-            return None
+    def _peek_token(self, k: int) -> Token:
+        # как TokenStream.LT: за пределами буфера - последний токен (EOF)
+        index = self._i + k - 1
+        if 0 <= index <= self._last:
+            return self._toks[index]
+        return self._toks[-1]
 
     def _peek_text(self, k: int):
-        t = self._peek_token(k)
-        return getattr(t, "text", None) if t is not None else None
+        return self._peek_token(k).text
 
     def _maybe_generic_suffix(self, base_type: str) -> str:
         """
         'List < String , Integer >' -> 'List<String,Integer>'.
         """
-        if not (self.current and getattr(self.current, "type", None) == "LT"):
+        if self.current.type != "LT":
             return base_type
+        # проход индексом по буферу токенов вместо advance() на каждый токен
+        toks = self._toks
+        last = self._last
+        ignored = self.IGNORED
+        i = self._i
         depth = 0
         out = [base_type]
-        while self.current and self.current.type != Token.EOF:
-            t = self.current
+        while toks[i].type != Token.EOF:
+            t = toks[i]
             if t.type == "LT":
                 depth += 1; out.append("<")
             elif t.type == "GT":
                 depth -= 1; out.append(">")
             else:
-                out.append(getattr(t, "text", t.type))
-            self.advance()
+                out.append(t.text)
+            if i < last:
+                i += 1
+            while i < last and toks[i].type in ignored:
+                i += 1
             if depth == 0:
                 break
+        self._i = i
+        self.current = toks[i]
         return "".join(out).replace(" ", "")
 
+    def _modifiers_node(self, modifiers: List[str]) -> ASTNode:
+        key = tuple(modifiers)
+        node = self._modifiers_nodes.get(key)
+        if node is None:
+            node = ASTNode("Modifiers", ",".join(modifiers))
+            self._modifiers_nodes[key] = node
+        return node
+
+    def _member_head_index(self) -> int:
+        """
+        Номер (для _peek_token) первого токена после модификаторов члена класса.
+        _is_constructor_start и _looks_like_method_decl вызываются подряд с одной
+        позиции, поэтому результат запоминается для последней позиции.
+        """
+        pos, i = self._member_head
+        if pos == self._i:
+            return i
+        i = 1
+        modifiers = self.MODIFIERS
+        while self._peek_token(i).type in modifiers:
+            i += 1
+        self._member_head = (self._i, i)
+        return i
+
     def _is_constructor_start(self):
         if not self._current_class_name:
             return False
-        i = 1
-        while True:
-            t = self._peek_token(i)
-            if t is None:
-                return False
-            if getattr(t, "type", None) in self.MODIFIERS:
-                i += 1
-                continue
-            break
+        i = self._member_head_index()
         t = self._peek_token(i)
-        t2 = self._peek_token(i + 1)
-        if t is None:
-            return False
-        if getattr(t, "type", None) == "IDENTIFIER" and getattr(t2, "type", None) == "LPAREN":
-            return getattr(t, "text", None) == self._current_class_name
+        if t.type == "IDENTIFIER" and self._peek_token(i + 1).type == "LPAREN":
+            return t.text == self._current_class_name
         return False
 
     def _looks_like_method_decl(self):
-        i = 1
-        while self.peek_type(i) in self.MODIFIERS:
-            i += 1
+        i = self._member_head_index()
         if self.peek_type(i) in self.TYPE_KEYWORDS or self.peek_type(i) == "VOID" or self.peek_type(i) == "IDENTIFIER":
             if self.peek_type(i + 1) == "IDENTIFIER" and self.peek_type(i + 2) == "LPAREN":
                 return True
         return False
 
     # --------------- entry ---------------
-    def parse(self):
+    def parse(self) -> ASTNode:
         return self.parse_compilation_unit()
 
-    def parse_compilation_unit(self):
+    def parse_compilation_unit(self) -> ASTNode:
         children = []
-        while self.current is not None and self.current.type != Token.EOF:
+        while self.current.type != Token.EOF:
             if self.current.type in self.MODIFIERS or self.current.type == "CLASS":
                 td = self.parse_type_declaration()
                 if td:
@@ -164,26 +278,21 @@ class SimpleJavaParser:
 
     # --------------- type / class ---------------
     def parse_type_declaration(self):
-        modifiers = []
-        while self.current is not None and self.current.type in self.MODIFIERS:
-            modifiers.append(self.current.type)
-            self.advance()
-        if self.current is not None and self.current.type == "CLASS":
+        modifiers = self._consume_modifiers()
+        if self.current.type == "CLASS":
             return self.parse_class_declaration(modifiers)
         return None
 
     def parse_class_declaration(self, modifiers=None):
         modifiers = modifiers or []
         self.match("CLASS")
-        if self.current is None:
-            raise SyntaxError("Ожидался идентификатор класса, получен EOF")
         class_token = self.current
         class_name = class_token.text
         self.match("IDENTIFIER")
 
         bases = []
         if self.accept("EXTENDS"):
-            if self.current and self.current.type == "IDENTIFIER":
+            if self.current.type == "IDENTIFIER":
                 base = self.current.text
                 self.advance()
                 bases.append(base)
@@ -196,7 +305,7 @@ class SimpleJavaParser:
         if bases:
             body_children.append(ASTNode("Base", ",".join(bases)))
 
-        while self.current is not None and self.current.type not in ("RBRACE", Token.EOF):
+        while self.current.type not in ("RBRACE", Token.EOF):
             if (self.current.type in self.MODIFIERS or
                 self.current.type in self.TYPE_KEYWORDS or
                 self.current.type == "IDENTIFIER" or
@@ -221,24 +330,21 @@ class SimpleJavaParser:
                 else:
                     self.advance()
 
-        if self.current is None or self.current.type == Token.EOF:
+        if self.current.type == Token.EOF:
             raise SyntaxError(f"Unclosed class body for class {class_name} — reached EOF without '}}'")
 
         self.match("RBRACE")
 
         node = ASTNode("ClassDecl", class_name, body_children, token=class_token)
         if modifiers:
-            node.children.insert(0, ASTNode("Modifiers", ",".join(modifiers)))
+            _mutable_children(node).insert(0, self._modifiers_node(modifiers))
         self._current_class_name = None
         return node
 
     def parse_constructor_declaration(self):
-        modifiers = []
-        while self.current is not None and self.current.type in self.MODIFIERS:
-            modifiers.append(self.current.type)
-            self.advance()
+        modifiers = self._consume_modifiers()
 
-        if self.current is None or self.current.type != "IDENTIFIER":
+        if self.current.type != "IDENTIFIER":
             raise SyntaxError("Ожидалось имя конструктора")
         constructor_name = self.current.text
         self.match("IDENTIFIER")
@@ -248,40 +354,98 @@ class SimpleJavaParser:
         self.match("RPAREN")
 
         body = []
-        if self.current and self.current.type == "LBRACE":
+        if self.current.type == "LBRACE":
             body = self.parse_block()
 
         node = ASTNode("ConstructorDecl", constructor_name, params + body)
         if modifiers:
-            node.children.insert(0, ASTNode("Modifiers", ",".join(modifiers)))
+            _mutable_children(node).insert(0, self._modifiers_node(modifiers))
         return node
 
     # --------------- fields / locals ---------------
+    def _consume_modifiers(self) -> List[str]:
+        """Съедает подряд идущие модификаторы и возвращает их типы по порядку."""
+        modifiers = self.MODIFIERS
+        t = self.current
+        if t.type not in modifiers:
+            return []
+        toks = self._toks
+        last = self._last
+        ignored = self.IGNORED
+        i = self._i
+        out = []
+        while t.type in modifiers:
+            out.append(t.type)
+            i = i + 1 if i < last else i
+            while i < last and toks[i].type in ignored: i += 1
+            t = toks[i]
+        self._i = i
+        self.current = t
+        return out
+
+    def _eat_array_brackets(self, type_str: str, skip_unpaired: bool = False) -> str:
+        """
+        'int' и '[ ] [ ]' -> 'int[][]'. '[' без пары съедается; в объявлениях полей
+        и переменных она завершает разбор типа, в сигнатурах (skip_unpaired) - нет.
+        """
+        dims = 0
+        while self.current.type == "LBRACK":
+            self.advance()
+            if self.current.type == "RBRACK":
+                self.advance()
+                dims += 1
+            elif not skip_unpaired:
+                break
+        return type_str + "[]" * dims if dims else type_str
+
+    def _parse_array_elements(self) -> ASTNode:
+        """{ e1, e2, ... } -> ArrayInit; текущий токен - '{'."""
+        self.advance()
+        elems = []
+        while self.current.type != "RBRACE":
+            elems.append(self.parse_expression())
+            if self.current.type == "COMMA":
+                self.advance()
+        self.match("RBRACE")
+        return ASTNode("ArrayInit", None, elems)
+
+    def _parse_initializer(self) -> ASTNode:
+        """Инициализатор после '=' в объявлении поля или локальной переменной."""
+        # new-массив
+        if self.current.type == "NEW":
+            self.advance()
+            if self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER":
+                elem_type = self.current.text; self.advance()
+                self._maybe_generic_suffix(elem_type)
+            while self.current.type == "LBRACK":
+                self.advance()
+                if self.current.type != "RBRACK":
+                    self.parse_expression()
+                self.match("RBRACK")
+            if self.current.type == "LBRACE":
+                return self._parse_array_elements()
+            return ASTNode("Unknown", "new-array")
+        # короткая форма { ... }
+        if self.current.type == "LBRACE":
+            return self._parse_array_elements()
+        return self.parse_expression()
+
     def parse_field_declaration(self):
-        mods = []
-        while self.current and self.current.type in self.MODIFIERS:
-            mods.append(self.current.type); self.advance()
+        mods = self._consume_modifiers()
 
         type_tok = None
-        if self.current and (self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER"):
+        if self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER":
             type_tok = self.current.text; self.advance()
             # generics
             type_tok = self._maybe_generic_suffix(type_tok)
-            while self.current and self.current.type == "LBRACK":
-                self.advance()
-                if self.current and self.current.type == "RBRACK":
-                    self.advance()
-                    type_tok = (type_tok or "") + "[]"
-                else:
-                    break
+            type_tok = self._eat_array_brackets(type_tok)
         else:
-            if self.current:
-                self.advance()
+            self.advance()
             return ASTNode("FieldDecl", f"{type_tok} var", [])
 
         decls = []
         while True:
-            if not (self.current and self.current.type == "IDENTIFIER"):
+            if self.current.type != "IDENTIFIER":
                 break
             name_token = self.current
             name = name_token.text
@@ -289,124 +453,53 @@ class SimpleJavaParser:
 
             init = None
             if self.accept("ASSIGN"):
-                # new-массив
-                if self.current and self.current.type == "NEW":
-                    self.advance()
-                    if self.current and (self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER"):
-                        _ = self.current.text; self.advance()
-                        _ = self._maybe_generic_suffix(_)
-                    while self.current and self.current.type == "LBRACK":
-                        self.advance()
-                        if self.current and self.current.type != "RBRACK":
-                            _ = self.parse_expression()
-                        self.match("RBRACK")
-                    if self.current and self.current.type == "LBRACE":
-                        self.advance()
-                        elems = []
-                        while self.current and self.current.type != "RBRACE":
-                            elems.append(self.parse_expression())
-                            if self.current and self.current.type == "COMMA":
-                                self.advance()
-                        self.match("RBRACE")
-                        init = ASTNode("ArrayInit", None, elems)
-                    else:
-                        init = ASTNode("Unknown", "new-array")
-                # короткая форма { ... }
-                elif self.current and self.current.type == "LBRACE":
-                    self.advance()
-                    elems = []
-                    while self.current and self.current.type != "RBRACE":
-                        elems.append(self.parse_expression())
-                        if self.current and self.current.type == "COMMA":
-                            self.advance()
-                    self.match("RBRACE")
-                    init = ASTNode("ArrayInit", None, elems)
-                else:
-                    init = self.parse_expression()
+                init = self._parse_initializer()
 
             fd_children = []
             if mods:
-                fd_children.append(ASTNode("Modifiers", ",".join(mods)))
+                fd_children.append(self._modifiers_node(mods))
             if init is not None:
                 fd_children.append(ASTNode("Init", None, [init]))
             decls.append(ASTNode("FieldDecl", f"{type_tok} {name}", fd_children, token=name_token))
 
-            if self.current and self.current.type == "COMMA":
+            if self.current.type == "COMMA":
                 self.advance()
                 continue
             break
 
 
-        if self.current and self.current.type == "SEMI":
+        if self.current.type == "SEMI":
             self.advance()
 
         return decls[0] if len(decls) == 1 else ASTNode("Block", children=decls)
 
     def parse_local_variable_declaration_no_semi(self):
-        while self.current and self.current.type in self.MODIFIERS:
-            self.advance()
+        self._consume_modifiers()
 
         type_tok = None
-        if self.current and (self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER"):
+        if self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER":
             type_tok = self.current.text; self.advance()
             type_tok = self._maybe_generic_suffix(type_tok)
-            while self.current and self.current.type == "LBRACK":
-                self.advance()
-                if self.current and self.current.type == "RBRACK":
-                    self.advance()
-                    type_tok = (type_tok or "") + "[]"
-                else:
-                    break
+            type_tok = self._eat_array_brackets(type_tok)
         else:
             return ASTNode("FieldDecl", f"{type_tok} var", [])
 
         decls = []
         while True:
-            if not (self.current and self.current.type == "IDENTIFIER"):
+            if self.current.type != "IDENTIFIER":
                 break
             name = self.current.text; self.advance()
 
             init = None
             if self.accept("ASSIGN"):
-                if self.current and self.current.type == "NEW":
-                    self.advance()
-                    if self.current and (self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER"):
-                        _ = self.current.text; self.advance()
-                        _ = self._maybe_generic_suffix(_)
-                    while self.current and self.current.type == "LBRACK":
-                        self.advance()
-                        if self.current and self.current.type != "RBRACK":
-                            _ = self.parse_expression()
-                        self.match("RBRACK")
-                    if self.current and self.current.type == "LBRACE":
-                        self.advance()
-                        elems = []
-                        while self.current and self.current.type != "RBRACE":
-                            elems.append(self.parse_expression())
-                            if self.current and self.current.type == "COMMA":
-                                self.advance()
-                        self.match("RBRACE")
-                        init = ASTNode("ArrayInit", None, elems)
-                    else:
-                        init = ASTNode("Unknown", "new-array")
-                elif self.current and self.current.type == "LBRACE":
-                    self.advance()
-                    elems = []
-                    while self.current and self.current.type != "RBRACE":
-                        elems.append(self.parse_expression())
-                        if self.current and self.current.type == "COMMA":
-                            self.advance()
-                    self.match("RBRACE")
-                    init = ASTNode("ArrayInit", None, elems)
-                else:
-                    init = self.parse_expression()
+                init = self._parse_initializer()
 
             fd = ASTNode("FieldDecl", f"{type_tok} {name}", [])
             if init is not None:
-                fd.children.append(ASTNode("Init", None, [init]))
+                _mutable_children(fd).append(ASTNode("Init", None, [init]))
             decls.append(fd)
 
-            if self.current and self.current.type == "COMMA":
+            if self.current.type == "COMMA":
                 self.advance()
                 continue
             break
@@ -415,24 +508,16 @@ class SimpleJavaParser:
 
     # --------------- methods ---------------
     def parse_method_declaration(self):
-        modifiers = []
-        while self.current is not None and self.current.type in self.MODIFIERS:
-            modifiers.append(self.current.type); self.advance()
+        modifiers = self._consume_modifiers()
 
         ret_type = None
-        if self.current is not None and (self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER" or self.current.type == "VOID"):
+        if self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER" or self.current.type == "VOID":
             ret_type = self.current.text; self.advance()
-            while self.current is not None and self.current.type == "LBRACK":
-                self.advance()
-                if self.current and self.current.type == "RBRACK":
-                    ret_type = (ret_type or "") + "[]"; self.advance()
+            ret_type = self._eat_array_brackets(ret_type, skip_unpaired=True)
         else:
             ret_type = "<unknown>"
-            if self.current is not None:
-                self.advance()
+            self.advance()
 
-        if self.current is None:
-            raise SyntaxError("Ожидался идентификатор метода, получен EOF")
         method_name = self.current.text
         self.match("IDENTIFIER")
 
@@ -441,59 +526,83 @@ class SimpleJavaParser:
         self.match("RPAREN")
 
         body = []
-        if self.current and self.current.type == "LBRACE":
+        if self.current.type == "LBRACE":
             body = self.parse_block()
 
         node = ASTNode("MethodDecl", f"{ret_type} {method_name}", params + body)
         if modifiers:
-            node.children.insert(0, ASTNode("Modifiers", ",".join(modifiers)))
+            _mutable_children(node).insert(0, self._modifiers_node(modifiers))
         return node
 
     def parse_parameter_list(self):
+        # Список разбирается локальным индексом по буферу токенов: шаг вперёд - те же
+        # две строки, что в advance(), а self._i/self.current обновляются один раз в конце.
+        toks = self._toks
+        last = self._last
+        ignored = self.IGNORED
+        modifiers = self.MODIFIERS
+        type_keywords = self.TYPE_KEYWORDS
         params = []
-        while self.current is not None and self.current.type not in ("RPAREN", Token.EOF):
-            if self.current.type in self.MODIFIERS:
-                self.advance(); continue
-            if self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER":
-                p_type = self.current.text; self.advance()
-                while self.current and self.current.type == "LBRACK":
-                    self.advance()
-                    if self.current and self.current.type == "RBRACK":
-                        p_type = (p_type or "") + "[]"; self.advance()
+        i = self._i
+        while True:
+            t = toks[i]
+            if t.type == "RPAREN" or t.type == Token.EOF:
+                break
+            if t.type in modifiers:
+                i = i + 1 if i < last else i
+                while i < last and toks[i].type in ignored: i += 1
+                continue
+            if t.type in type_keywords or t.type == "IDENTIFIER":
+                p_type = t.text
+                i = i + 1 if i < last else i
+                while i < last and toks[i].type in ignored: i += 1
+                # как _eat_array_brackets(..., skip_unpaired=True)
+                dims = 0
+                while toks[i].type == "LBRACK":
+                    i = i + 1 if i < last else i
+                    while i < last and toks[i].type in ignored: i += 1
+                    if toks[i].type == "RBRACK":
+                        dims += 1
+                        i = i + 1 if i < last else i
+                        while i < last and toks[i].type in ignored: i += 1
+                if dims:
+                    p_type += "[]" * dims
             else:
-                p_type = "<unknown>"; self.advance()
+                p_type = "<unknown>"
+                i = i + 1 if i < last else i
+                while i < last and toks[i].type in ignored: i += 1
             p_name = None
             name_token = None
-            if self.current is not None and self.current.type == "IDENTIFIER":
-                name_token = self.current
+            if toks[i].type == "IDENTIFIER":
+                name_token = toks[i]
                 p_name = name_token.text
-                self.advance()
+                i = i + 1 if i < last else i
+                while i < last and toks[i].type in ignored: i += 1
             params.append(ASTNode("Param", f"{p_type} {p_name}", token=name_token))
-            if self.current is not None and self.current.type == "COMMA":
-                self.advance(); continue
-            else:
+            if toks[i].type != "COMMA":
                 break
+            i = i + 1 if i < last else i
+            while i < last and toks[i].type in ignored: i += 1
+        self._i = i
+        self.current = toks[i]
         return params
 
     # --------------- blocks / statements ---------------
     def parse_block(self):
         stmts = []
-        if self.current is not None and self.current.type == "LBRACE":
+        if self.current.type == "LBRACE":
             self.advance()
         else:
             return []
-        while self.current is not None and self.current.type not in ("RBRACE", Token.EOF):
+        while self.current.type not in ("RBRACE", Token.EOF):
             stmts.append(self.parse_statement())
-        if self.current is None or self.current.type == Token.EOF:
+        if self.current.type == Token.EOF:
             raise SyntaxError("Reached EOF while parsing a block — missing '}'")
         self.advance()  # RBRACE
         return stmts
 
     def _looks_like_local_decl_start(self) -> bool:
-        t1 = self._peek_token(1)
-        if t1 is None:
-            return False
-        if t1.type != "IDENTIFIER":
+        if self.current.type != "IDENTIFIER":
             return False
 
         i = 2
@@ -503,7 +612,8 @@ class SimpleJavaParser:
             depth = 0
             while True:
                 tok = self._peek_token(i)
-                if tok is None:
+                # за концом буфера _peek_token отдаёт EOF: незакрытый '<' - не объявление
+                if tok.type == Token.EOF:
                     return False
                 if tok.type == "LT":
                     depth += 1
@@ -520,43 +630,9 @@ class SimpleJavaParser:
         return self.peek_type(i) == "IDENTIFIER"
 
     def parse_statement(self):
-        if self.current is None:
-            return ASTNode("Empty")
-
-        if self.current.type == "IF":
-            return self.parse_if_statement()
-        if self.current.type == "SWITCH":
-            return self.parse_switch_statement()
-        if self.current.type == "FOR":
-            return self.parse_for_statement()
-        if self.current.type == "WHILE":
-            return self.parse_while_statement()
-        if self.current.type == "DO":
-            return self.parse_do_while_statement()
-        if self.current.type == "TRY":
-            return self.parse_try_statement()
-        if self.current.type == "BREAK":
-            self.advance()
-            if self.current and self.current.type == "SEMI":
-                self.advance()
-            return ASTNode("Break")
-        if self.current.type == "CONTINUE":
-            self.advance()
-            if self.current and self.current.type == "SEMI":
-                self.advance()
-            return ASTNode("Continue")
-        if self.current.type == "RETURN":
-            tok = self.current
-            self.advance()
-            expr = None
-            if self.current and self.current.type != "SEMI":
-                expr = self.parse_expression()
-            if self.current and self.current.type == "SEMI":
-                self.advance()
-            return ASTNode("Return", children=[expr] if expr else [], token=tok)
-        if self.current.type == "LBRACE":
-            stmts = self.parse_block()
-            return ASTNode("Block", children=stmts)
+        handler = self._stmt_dispatch.get(self.current.type)
+        if handler is not None:
+            return handler()
 
         if self.current.type in self.TYPE_KEYWORDS:
             node = self.parse_field_declaration()
@@ -564,46 +640,59 @@ class SimpleJavaParser:
 
         if self.current.type == "IDENTIFIER" and self._looks_like_local_decl_start():
             node = self.parse_local_variable_declaration_no_semi()
-            if self.current and self.current.type == "SEMI":
+            if self.current.type == "SEMI":
                 self.advance()
             return node
 
         left = self.parse_expression()
 
-        if self.current is not None and self.current.type == "ASSIGN":
+        if self.current.type == "ASSIGN":
             self.advance()
             right = self.parse_expression()
             node = ASTNode("Assign", None, [left, right])
-            if self.current and self.current.type == "SEMI":
+            if self.current.type == "SEMI":
                 self.advance()
             return node
 
-        compound = {
-            "ADD_ASSIGN": "ADD",
-            "SUB_ASSIGN": "SUB",
-            "MUL_ASSIGN": "MUL",
-            "DIV_ASSIGN": "DIV",
-            "MOD_ASSIGN": "MOD",
-            "AND_ASSIGN": "BITAND",
-            "OR_ASSIGN":  "BITOR",
-            "XOR_ASSIGN": "CARET",
-            "LSHIFT_ASSIGN": "LSHIFT",
-            "RSHIFT_ASSIGN": "RSHIFT",
-            "URSHIFT_ASSIGN": "URSHIFT",
-        }
-        if self.current is not None and self.current.type in compound:
-            op = compound[self.current.type]
+        op = self.COMPOUND_ASSIGN.get(self.current.type)
+        if op is not None:
             self.advance()
             rhs = self.parse_expression()
             node = ASTNode("Assign", None, [left, ASTNode("BinaryOp", op, [left, rhs])])
-            if self.current and self.current.type == "SEMI":
+            if self.current.type == "SEMI":
                 self.advance()
             return node
 
-        if self.current and self.current.type == "SEMI":
+        if self.current.type == "SEMI":
             self.advance()
         return ASTNode("ExprStmt", None, [left])
 
+    def parse_break_statement(self):
+        self.match("BREAK")
+        if self.current.type == "SEMI":
+            self.advance()
+        return self._BREAK
+
+    def parse_continue_statement(self):
+        self.match("CONTINUE")
+        if self.current.type == "SEMI":
+            self.advance()
+        return self._CONTINUE
+
+    def parse_return_statement(self):
+        tok = self.current
+        self.match("RETURN")
+        expr = None
+        if self.current.type != "SEMI":
+            expr = self.parse_expression()
+        if self.current.type == "SEMI":
+            self.advance()
+        return ASTNode("Return", children=[expr] if expr else [], token=tok)
+
+    def parse_block_statement(self):
+        stmts = self.parse_block()
+        return ASTNode("Block", children=stmts)
+
     def parse_if_statement(self):
         self.match("IF")
         self.match("LPAREN")
@@ -612,9 +701,9 @@ class SimpleJavaParser:
         then_block = ASTNode("Then", children=self.parse_block())
         else_node = None
         if self.accept("ELSE"):
-            if self.current and self.current.type == "IF":
+            if self.current.type == "IF":
                 else_node = self.parse_if_statement()
-            elif self.current and self.current.type == "LBRACE":
+            elif self.current.type == "LBRACE":
                 else_block_children = self.parse_block()
                 else_node = ASTNode("Else", children=else_block_children)
             else:
@@ -628,15 +717,15 @@ class SimpleJavaParser:
         try_block = ASTNode("TryBlock", None, self.parse_block())
 
         catches = []
-        while self.current and self.current.type == "CATCH":
+        while self.current.type == "CATCH":
             self.advance()
             self.match("LPAREN")
             ex_type = None
             var_name = None
-            if self.current and (self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER"):
+            if self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER":
                 ex_type = self.current.text
                 self.advance()
-            if self.current and self.current.type == "IDENTIFIER":
+            if self.current.type == "IDENTIFIER":
                 var_name = self.current.text
                 self.advance()
             self.match("RPAREN")
@@ -652,12 +741,19 @@ class SimpleJavaParser:
         return ASTNode("TryStatement", None, children)
 
     # --------------- expressions ---------------
-    def parse_expression(self, min_prec=0):
+    def parse_expression(self, min_prec: int = 0) -> ASTNode:
+        """
+        Разбор по приоритетам без рекурсии на каждый бинарный оператор.
+        Стек хранит уровни, ожидающие правый операнд: (min_prec уровня, левый операнд, оператор) -
+        то же, что раньше лежало в кадрах рекурсивных вызовов parse_expression(prec + 1).
+        """
+        precedence = self.PRECEDENCE
+        pending = []
         left = self.parse_primary()
         while True:
-            if self.current is None:
-                break
-            if self.current.type == "QUESTION":
+            op_type = self.current.type
+            if op_type == "QUESTION":
+                # тернарный оператор относится к текущему уровню, как и при рекурсивном разборе
                 self.advance()
                 texpr = self.parse_expression()
                 self.match("COLON")
@@ -665,20 +761,21 @@ class SimpleJavaParser:
                 left = ASTNode("Ternary", None, [left, texpr, fexpr])
                 continue
 
-            op_type = self.current.type
-            prec = self.PRECEDENCE.get(op_type, -1)
+            prec = precedence.get(op_type, -1)
             if prec < min_prec:
-                break
-            op_tok = self.current
-            self.advance()
-            right = self.parse_expression(prec + 1)
-            left = ASTNode("BinaryOp", op_tok.type, [left, right])
-        return left
+                # уровень завершён: его результат - правый операнд ожидающего оператора
+                if not pending:
+                    return left
+                min_prec, op_left, pending_op = pending.pop()
+                left = ASTNode("BinaryOp", pending_op, [op_left, left])
+                continue
 
-    def parse_primary(self):
-        if self.current is None:
-            return ASTNode("Empty")
+            self.advance()
+            pending.append((min_prec, left, op_type))
+            min_prec = prec + 1
+            left = self.parse_primary()
 
+    def parse_primary(self) -> ASTNode:
         if self.current.type in ("INC", "DEC", "BANG", "ADD", "SUB", "TILDE"):
             op_token = self.current
             op = op_token.type
@@ -708,41 +805,67 @@ class SimpleJavaParser:
             id_token = self.current
             name = id_token.text.lower() if id_token.type in ("THIS", "SUPER") else id_token.text
             base = ASTNode("Identifier", name, token=id_token)
-            self.advance()
+            # постфиксная цепочка a.b(x).c++ - курсор двигается напрямую,
+            # как в parse_parameter_list; self._i/self.current обновляются
+            # только перед вложенным parse_expression и на выходе
+            toks = self._toks
+            last = self._last
+            ignored = self.IGNORED
+            node = ASTNode
+            i = self._i + 1 if self._i < last else self._i
+            while i < last and toks[i].type in ignored: i += 1
+            t = toks[i]
             while True:
-                if self.current is not None and self.current.type == "DOT":
-                    self.advance()
-                    if self.current and self.current.type == "IDENTIFIER":
-                        member_tok = self.current
-                        member_name = member_tok.text
-                        self.advance()
-                        base = ASTNode("Member", member_name, [base], token=member_tok)
+                tt = t.type
+                if tt == "DOT":
+                    i = i + 1 if i < last else i
+                    while i < last and toks[i].type in ignored: i += 1
+                    t = toks[i]
+                    if t.type == "IDENTIFIER":
+                        member_tok = t
+                        i = i + 1 if i < last else i
+                        while i < last and toks[i].type in ignored: i += 1
+                        t = toks[i]
+                        base = node("Member", member_tok.text, [base], token=member_tok)
                         continue
                     break
-                if self.current is not None and self.current.type == "LPAREN":
-                    call_tok = self.current
-                    self.advance()
+                if tt == "LPAREN":
+                    call_tok = t
+                    i = i + 1 if i < last else i
+                    while i < last and toks[i].type in ignored: i += 1
+                    t = toks[i]
                     args = []
-                    if self.current is not None and self.current.type != "RPAREN":
+                    if t.type != "RPAREN":
+                        self._i = i
+                        self.current = t
                         args.append(self.parse_expression())
-                        while self.current is not None and self.current.type == "COMMA":
+                        while self.current.type == "COMMA":
                             self.advance()
                             args.append(self.parse_expression())
-                    self.match("RPAREN")
-                    base = ASTNode("Call", base, args, token=call_tok)
+                        self.match("RPAREN")
+                        i = self._i
+                        t = self.current
+                    else:
+                        i = i + 1 if i < last else i
+                        while i < last and toks[i].type in ignored: i += 1
+                        t = toks[i]
+                    base = node("Call", base, args, token=call_tok)
                     continue
-                if self.current is not None and self.current.type in ("INC", "DEC"):
-                    op_tok = self.current
-                    op = op_tok.type
-                    self.advance()
-                    base = ASTNode("PostfixOp", op, [base], token=op_tok)
+                if tt == "INC" or tt == "DEC":
+                    op_tok = t
+                    i = i + 1 if i < last else i
+                    while i < last and toks[i].type in ignored: i += 1
+                    t = toks[i]
+                    base = node("PostfixOp", tt, [base], token=op_tok)
                     continue
                 break
+            self._i = i
+            self.current = t
             return base
 
         tok = self.current
-        token_text = getattr(tok, "text", None)
-        token_type = getattr(tok, "type", None)
+        token_text = tok.text
+        token_type = tok.type
         self.advance()
         return ASTNode("Unknown", f"{token_type}:{token_text}", token=tok)
 
@@ -762,7 +885,7 @@ class SimpleJavaParser:
         self.match("LPAREN")
         condition = self.parse_expression()
         self.match("RPAREN")
-        if self.current and self.current.type == "SEMI":
+        if self.current.type == "SEMI":
             self.advance()
         return ASTNode("DoWhileStatement", children=[condition, body])
 
@@ -770,27 +893,26 @@ class SimpleJavaParser:
         self.match("FOR")
         self.match("LPAREN")
 
-        lookahead_index = 1
+        # for-each или классический for: ищем ':' до первого ';' / ')'.
+        # Скан ограничен буфером, так что незакрытый заголовок упирается в EOF
+        toks = self._toks
+        last = self._last
+        i = self._i
         found_colon = False
-        while True:
-            t = self.tokens.LT(lookahead_index)
-            if t is None:
-                break
-            if t.type == "COLON":
+        while i <= last:
+            tt = toks[i].type
+            if tt == "COLON":
                 found_colon = True
                 break
-            if t.type == "SEMI" or t.type == "RPAREN":
+            if tt == "SEMI" or tt == "RPAREN":
                 break
-            lookahead_index += 1
+            i += 1
 
         if found_colon:
             first_type = None
             if self.current.type in self.TYPE_KEYWORDS or self.current.type == "IDENTIFIER":
                 first_type = self.current.text; self.advance()
-                while self.current and self.current.type == "LBRACK":
-                    self.advance()
-                    if self.current and self.current.type == "RBRACK":
-                        first_type = (first_type or "") + "[]"; self.advance()
+                first_type = self._eat_array_brackets(first_type, skip_unpaired=True)
             var_name = None
             name_token = None
             if self.current.type == "IDENTIFIER":
@@ -810,14 +932,14 @@ class SimpleJavaParser:
                 init = self.parse_local_variable_declaration_no_semi()
             else:
                 init = self.parse_expression()
-        if self.current and self.current.type == "SEMI":
+        if self.current.type == "SEMI":
             self.advance()
         else:
             raise SyntaxError("Ожидался ';' в заголовке for")
         condition = None
         if self.current.type != "SEMI":
             condition = self.parse_expression()
-        if self.current and self.current.type == "SEMI":
+        if self.current.type == "SEMI":
             self.advance()
         else:
             raise SyntaxError("Ожидался ';' в заголовке for (между условием и обновлением)")
@@ -834,29 +956,31 @@ class SimpleJavaParser:
         self.match("LPAREN")
         expr = self.parse_expression()
         self.match("RPAREN")
-        if self.current and self.current.type == "LBRACE":
+        if self.current.type == "LBRACE":
             self.advance()
         cases = []
-        while self.current is not None and self.current.type not in ("RBRACE", Token.EOF):
+        stop = self.SWITCH_STOP
+        case_stop = self.SWITCH_CASE_STOP
+        while self.current.type not in stop:
             if self.current.type == "CASE":
                 self.advance()
                 case_val = self.parse_expression()
-                if self.current and self.current.type == "COLON":
+                if self.current.type == "COLON":
                     self.advance()
                 stmts = []
-                while self.current is not None and self.current.type not in ("CASE", "DEFAULT", "RBRACE"):
+                while self.current.type not in case_stop:
                     stmts.append(self.parse_statement())
                 cases.append(ASTNode("CaseLabel", None, [case_val] + stmts))
             elif self.current.type == "DEFAULT":
                 self.advance()
-                if self.current and self.current.type == "COLON":
+                if self.current.type == "COLON":
                     self.advance()
                 stmts = []
-                while self.current is not None and self.current.type not in ("CASE", "DEFAULT", "RBRACE"):
+                while self.current.type not in case_stop:
                     stmts.append(self.parse_statement())
                 cases.append(ASTNode("DefaultLabel", None, stmts))
             else:
                 self.advance()
-        if self.current and self.current.type == "RBRACE":
+        if self.current.type == "RBRACE":
             self.advance()
         return ASTNode("SwitchStatement", None, [expr] + cases)
@@ -1,9 +1,8 @@
-from io import StringIO
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 
 class Token(object):
-    __slots__ = ('source', 'type', 'channel', 'start', 'stop', 'tokenIndex', 'line', 'column', '_text')
+    __slots__ = ('source', 'type', 'channel', 'start', 'stop', 'tokenIndex', 'line', 'column', 'text')
 
     INVALID_TYPE = 0
     EPSILON = -2
@@ -15,22 +14,15 @@ class Token(object):
 
     def __init__(self):
         self.source: Optional[Tuple] = None
-        self.type: Optional[int] = None
+        # строковый тип из лексера ("IDENTIFIER", "SEMI", ...) либо Token.EOF
+        self.type: Optional[Union[int, str]] = None
         self.channel: Optional[int] = None
         self.start: Optional[int] = None
         self.stop: Optional[int] = None
         self.tokenIndex: Optional[int] = None
         self.line: Optional[int] = None
         self.column: Optional[int] = None
-        self._text: Optional[str] = None
-
-    @property
-    def text(self) -> Optional[str]:
-        return self._text
-
-    @text.setter
-    def text(self, text: Optional[str]) -> None:
-        self._text = text
+        self.text: Optional[str] = None
 
     def getTokenSource(self):
         return self.source[0] if self.source else None
@@ -42,7 +34,7 @@ class Token(object):
 class CommonToken(Token):
     EMPTY_SOURCE = (None, None)
 
-    def __init__(self, source: tuple = EMPTY_SOURCE, type: int = None, channel: int = Token.DEFAULT_CHANNEL, start: int = -1, stop: int = -1):
+    def __init__(self, source: tuple = EMPTY_SOURCE, type: Optional[Union[int, str]] = None, channel: int = Token.DEFAULT_CHANNEL, start: int = -1, stop: int = -1):
         super().__init__()
         self.source = source
         self.type = type
@@ -65,10 +57,13 @@ class CommonToken(Token):
         t.text = self.text
         return t
 
-    @property
-    def text(self) -> Optional[str]:
-        if self._text is not None:
-            return self._text
+    def resolve_text(self) -> Optional[str]:
+        """
+        Текст токена; если он не задан явно, берётся из входного потока по start/stop.
+        Фабрика вызывает его при создании токена, так что чтение .text - просто слот.
+        """
+        if self.text is not None:
+            return self.text
         input_stream = self.getInputStream()
         if input_stream is None:
             return None
@@ -79,37 +74,14 @@ class CommonToken(Token):
             return input_stream.getText(self.start, self.stop)
         return "<EOF>"
 
-    @text.setter
-    def text(self, text: Optional[str]) -> None:
-        self._text = text
-
     def __str__(self) -> str:
-        with StringIO() as buf:
-            buf.write("[@")
-            buf.write(str(self.tokenIndex))
-            buf.write(",")
-            buf.write(str(self.start))
-            buf.write(":")
-            buf.write(str(self.stop))
-            buf.write("='")
-            txt = self.text
-            if txt is not None:
-                txt = txt.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
-            else:
-                txt = "<no text>"
-            buf.write(txt)
-            buf.write("',<")
-            buf.write(str(self.type))
-            buf.write(">")
-            if self.channel is not None and self.channel > 0:
-                buf.write(",channel=")
-                buf.write(str(self.channel))
-            buf.write(",")
-            buf.write(str(self.line))
-            buf.write(":")
-            buf.write(str(self.column))
-            buf.write("]")
-            return buf.getvalue()
+        txt = self.resolve_text()
+        if txt is None:
+            txt = "<no text>"
+        elif "\n" in txt or "\r" in txt or "\t" in txt:
+            txt = txt.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+        channel = f",channel={self.channel}" if self.channel is not None and self.channel > 0 else ""
+        return f"[@{self.tokenIndex},{self.start}:{self.stop}='{txt}',<{self.type}>{channel},{self.line}:{self.column}]"
         
 
 class CommonTokenFactory:
@@ -118,7 +90,7 @@ class CommonTokenFactory:
     
     def create(self, source, type_, text, channel, start, stop, line, column):
         t = CommonToken(source, type_, channel, start, stop)
-        t._text = text
+        t.text = text if text is not None else t.resolve_text()
         t.line = line
         t.column = column
         return t
@@ -1,28 +1,28 @@
+from typing import List, Optional, Union
+
+from Token import Token
+
+
 class TokenStream:
-    def __init__(self, lexer):
+    def __init__(self, lexer) -> None:
         self.lexer = lexer
-        self.tokens = []
-        self.pos = 0
+        self.tokens: List[Token] = []
+        self.pos: int = 0
         self._fill_tokens()
 
-    def _fill_tokens(self):
-        while True:
-            tok = self.lexer.nextToken()
-            if getattr(tok, "channel", 0) == 1:  # Token.HIDDEN_CHANNEL
-                continue
-            self.tokens.append(tok)
-            if tok.type == tok.EOF:
-                break
+    def _fill_tokens(self) -> None:
+        # лексер отдаёт токены до EOF включительно
+        self.tokens = [tok for tok in self.lexer if tok.channel != 1]  # Token.HIDDEN_CHANNEL
 
-    def LT(self, k: int):
+    def LT(self, k: int) -> Token:
         index = self.pos + k - 1
         if 0 <= index < len(self.tokens):
             return self.tokens[index]
         return self.tokens[-1]  # EOF fallback
 
-    def consume(self):
+    def consume(self) -> None:
         if self.pos < len(self.tokens) - 1:
             self.pos += 1
 
-    def LA(self, k: int):
+    def LA(self, k: int) -> Optional[Union[int, str]]:
         return self.LT(k).type